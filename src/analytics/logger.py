@@ -49,6 +49,8 @@ class AnalyticsLogger:
         self.enabled = database_url is not None
         self._event_queue: list[dict[str, Any]] = []
         self._flush_task: asyncio.Task | None = None
+        # Batch-size flushes run as tasks so callers never wait on the database insert
+        self._pending_flushes: set[asyncio.Task] = set()
         self._lock = asyncio.Lock()
         self.server_version = "1.0.0"
 
@@ -81,6 +83,9 @@ class AnalyticsLogger:
             with contextlib.suppress(asyncio.CancelledError):
                 await self._flush_task
 
+        if self._pending_flushes:
+            await asyncio.gather(*self._pending_flushes, return_exceptions=True)
+
         # Flush remaining events
         await self.flush()
 
@@ -165,7 +170,9 @@ class AnalyticsLogger:
             should_flush = len(self._event_queue) >= self.batch_size
 
         if should_flush:
-            await self.flush()
+            task = asyncio.create_task(self.flush())
+            self._pending_flushes.add(task)
+            task.add_done_callback(self._pending_flushes.discard)
 
     def _get_context(self) -> dict[str, Any]:
         """Get current request context from context variables."""
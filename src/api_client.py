@@ -1,19 +1,67 @@
+import asyncio
 import logging
-from typing import Any
+import re
+import weakref
+from typing import Any, Self
 from urllib.parse import urlencode, urlparse
 
 import anyio
 import httpx
 
+from .config import config
+
 logger = logging.getLogger(__name__)
 
 BEARER_PREFIX = "Bearer "
 
+# idt:TKN-XXXX-XXXX:actual_token, optionally behind a Bearer prefix; group 1 is the user identifier
+_IDT_TOKEN_RE = re.compile(r"\s*(?:Bearer\s+)?idt:(TKN-[^:]*):")
+
+# APIClient instances are created per tool call, so the cap on concurrent upstream
+# requests lives at module level to bound fan-out across the whole process.
+# asyncio primitives belong to one event loop, so there is one semaphore per running loop.
+_request_semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = weakref.WeakKeyDictionary()
+
+
+def _get_request_semaphore() -> asyncio.Semaphore:
+    """Return the request semaphore for the running event loop, creating it on first use"""
+    loop = asyncio.get_running_loop()
+    semaphore = _request_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _request_semaphores[loop] = asyncio.Semaphore(config.marketplace_max_concurrent_requests)
+    return semaphore
+
+
+# Keep-alive pool for each client's persistent connection; HTTP/2 multiplexes requests on top of it
+_CONNECTION_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=40)
+
+# One pool per running loop for APIClient(shared_pool=True). HTTP mode keeps an APIClient per tenant;
+# sharing the pool means a dropped client never strands open sockets, and every request still
+# carries its own client's Authorization header.
+_shared_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = weakref.WeakKeyDictionary()
+
+
+def _get_shared_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client for the running event loop, creating it on first use"""
+    loop = asyncio.get_running_loop()
+    client = _shared_clients.get(loop)
+    if client is None:
+        # No pool-wide timeout: every request passes its own APIClient's timeout
+        client = _shared_clients[loop] = httpx.AsyncClient(follow_redirects=True, http2=True, limits=_CONNECTION_LIMITS)
+    return client
+
+
+async def close_shared_client() -> None:
+    """Close the shared HTTP client of the running event loop, if one was opened"""
+    client = _shared_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
 
 class APIClient:
     """Client for making authenticated requests to the SoftwareOne Marketplace API"""
 
-    def __init__(self, base_url: str, token: str, timeout: float = 30.0):
+    def __init__(self, base_url: str, token: str, timeout: float = 30.0, shared_pool: bool = False):
         """
         Initialize the API client
 
@@ -21,6 +69,7 @@ class APIClient:
             base_url: Base URL of the marketplace API (any path will be stripped)
             token: Authentication token (with or without "Bearer" prefix)
             timeout: Default request timeout in seconds
+            shared_pool: Use the process-wide connection pool (closed with close_shared_client) instead of one owned by this client
         """
         # Normalize the base URL to only scheme://hostname[:port]
         # This prevents path duplication when OpenAPI paths are absolute
@@ -52,6 +101,37 @@ class APIClient:
             logger.info(f"👤 Authenticated as user: {self.user_id}")
 
         self.timeout = timeout
+        # Explicit timeouts: connect and default (read/write/pool) use self.timeout, with connect at least 30s.
+        # Passed on every request too, so clients on the shared pool keep their own timeout.
+        self._timeout_config = httpx.Timeout(timeout, connect=30.0)
+
+        # Opened on first request and reused so repeated queries skip TCP/TLS setup
+        self._shared_pool = shared_pool
+        self._client: httpx.AsyncClient | None = None
+        self._client_lock = asyncio.Lock()
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        """Return the pooled HTTP client, opening it on first use"""
+        if self._shared_pool:
+            return _get_shared_client()
+        if self._client is None:
+            async with self._client_lock:
+                if self._client is None:
+                    client = httpx.AsyncClient(follow_redirects=True, http2=True, timeout=self._timeout_config, limits=_CONNECTION_LIMITS)
+                    self._client = await client.__aenter__()
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client and its connections (the shared pool is left open)"""
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
 
     @staticmethod
     def _extract_user_id(token: str) -> str | None:
@@ -67,16 +147,8 @@ class APIClient:
         Returns:
             User identifier (TKN-XXXX-XXXX) or None if not found
         """
-        # Remove "Bearer " prefix if present for parsing
-        token_value = token.replace(BEARER_PREFIX, "").strip()
-
-        # Check if token matches format: idt:TKN-XXXX-XXXX:token
-        if token_value.startswith("idt:") and token_value.count(":") >= 2:
-            parts = token_value.split(":")
-            if len(parts) >= 3 and parts[1].startswith("TKN-"):
-                return parts[1]  # Return TKN-XXXX-XXXX
-
-        return None
+        match = _IDT_TOKEN_RE.match(token)
+        return match.group(1) if match else None  # Return TKN-XXXX-XXXX
 
     def _get_headers(self) -> dict[str, str]:
         """Get request headers with authentication"""
@@ -144,58 +216,59 @@ class APIClient:
             logger.info(f"   Parameters: {original_params}")
         logger.info(f"   Full URL: {url}")
 
-        # Explicit timeouts: connect and default (read/write/pool) use self.timeout, with connect at least 30s
-        timeout_config = httpx.Timeout(self.timeout, connect=30.0)
-        async with httpx.AsyncClient(follow_redirects=True, http2=True, timeout=timeout_config) as client:
-            try:
-                with anyio.fail_after(self.timeout):
+        client = await self._get_client()
+        try:
+            # Waiting for a slot counts against the timeout too
+            with anyio.fail_after(self.timeout):
+                async with _get_request_semaphore():
                     response = await client.get(
                         url,
                         params=params,  # Will be None if RQL was used
                         headers=headers,
+                        timeout=self._timeout_config,
                     )
                     response.raise_for_status()
                     response_data = response.json()
-            except TimeoutError as e:
-                raise httpx.TimeoutException(f"Request timed out after {self.timeout} seconds") from e
-
-            # Log the API response
-            logger.info(f"✅ Response: {response.status_code}")
-
-            # Try to log useful info about the response
-            if isinstance(response_data, dict):
-                if "data" in response_data:
-                    data = response_data["data"]
-                    if isinstance(data, list):
-                        logger.info(f"   Items returned: {len(data)}")
-                    elif isinstance(data, dict):
-                        logger.info("   Single item returned")
-
-                # Check for $meta.pagination (SoftwareOne API format)
-                if "$meta" in response_data and isinstance(response_data["$meta"], dict):
-                    meta = response_data["$meta"]
-                    if "pagination" in meta:
-                        pagination = meta["pagination"]
-                        total = pagination.get("total")
-                        offset = pagination.get("offset")
-                        limit = pagination.get("limit")
-                        logger.info(f"   Pagination: offset={offset}, limit={limit}, total={total}")
-
-                    # Log omitted fields if present
-                    if "omitted" in meta:
-                        omitted = meta.get("omitted", [])
-                        if omitted:
-                            logger.info(f"   Omitted fields: {', '.join(omitted)} (use select=+field to include)")
-                # Fallback to root-level pagination
-                elif "pagination" in response_data:
-                    pagination = response_data["pagination"]
-                    logger.info(f"   Pagination: {pagination}")
-            elif isinstance(response_data, list):
-                logger.info(f"   Items returned: {len(response_data)}")
-
-            logger.info("=" * 80)
-
-            return response_data
+        except TimeoutError as e:
+            raise httpx.TimeoutException(f"Request timed out after {self.timeout} seconds") from e
+
+        # Log the API response
+        logger.info(f"✅ Response: {response.status_code}")
+
+        # Try to log useful info about the response
+        if isinstance(response_data, dict):
+            if "data" in response_data:
+                data = response_data["data"]
+                if isinstance(data, list):
+                    logger.info(f"   Items returned: {len(data)}")
+                elif isinstance(data, dict):
+                    logger.info("   Single item returned")
+
+            # Check for $meta.pagination (SoftwareOne API format)
+            if "$meta" in response_data and isinstance(response_data["$meta"], dict):
+                meta = response_data["$meta"]
+                if "pagination" in meta:
+                    pagination = meta["pagination"]
+                    total = pagination.get("total")
+                    offset = pagination.get("offset")
+                    limit = pagination.get("limit")
+                    logger.info(f"   Pagination: offset={offset}, limit={limit}, total={total}")
+
+                # Log omitted fields if present
+                if "omitted" in meta:
+                    omitted = meta.get("omitted", [])
+                    if omitted:
+                        logger.info(f"   Omitted fields: {', '.join(omitted)} (use select=+field to include)")
+            # Fallback to root-level pagination
+            elif "pagination" in response_data:
+                pagination = response_data["pagination"]
+                logger.info(f"   Pagination: {pagination}")
+        elif isinstance(response_data, list):
+            logger.info(f"   Items returned: {len(response_data)}")
+
+        logger.info("=" * 80)
+
+        return response_data
 
     async def get_raw(
         self,
@@ -215,19 +288,20 @@ class APIClient:
         url = f"{self.base_url}{endpoint}"
         headers = self._get_headers()
 
-        timeout_config = httpx.Timeout(self.timeout, connect=30.0)
-        async with httpx.AsyncClient(follow_redirects=True, http2=True, timeout=timeout_config) as client:
-            try:
-                with anyio.fail_after(self.timeout):
+        client = await self._get_client()
+        try:
+            with anyio.fail_after(self.timeout):
+                async with _get_request_semaphore():
                     response = await client.get(
                         url,
                         params=params,
                         headers=headers,
+                        timeout=self._timeout_config,
                     )
                     response.raise_for_status()
                     return response.text
-            except TimeoutError as e:
-                raise httpx.TimeoutException(f"Request timed out after {self.timeout} seconds") from e
+        except TimeoutError as e:
+            raise httpx.TimeoutException(f"Request timed out after {self.timeout} seconds") from e
 
     async def validate_token(self) -> bool:
         """
@@ -6,14 +6,25 @@ from pathlib import Path
 from typing import Any
 
 import httpx
+import pydantic_core
 
 DEFAULT_FETCH_TIMEOUT = 30.0
 
 
 def _read_json_path(path: Path) -> dict[str, Any]:
     """Read and parse a JSON file (sync; run via asyncio.to_thread from async code)."""
-    with open(path) as f:
-        return json.load(f)
+    return pydantic_core.from_json(path.read_bytes())
+
+
+def _is_parsed_payload(payload: Any) -> bool:
+    """Check that a stored payload is a [spec, registry] pair with one dict per resource."""
+    return (
+        isinstance(payload, list)
+        and len(payload) == 2
+        and isinstance(payload[0], dict)
+        and isinstance(payload[1], dict)
+        and all(isinstance(info, dict) for info in payload[1].values())
+    )
 
 
 class CacheManager:
@@ -42,6 +53,11 @@ class CacheManager:
         key_hash = hashlib.md5(key.encode()).hexdigest()
         return self.cache_dir / f"{key_hash}.meta.json"
 
+    def _get_parsed_path(self, key: str) -> Path:
+        """Get the path of the parse results derived from a key's cached data"""
+        key_hash = hashlib.md5(key.encode()).hexdigest()
+        return self.cache_dir / f"{key_hash}.parsed"
+
     def _is_cache_valid(self, key: str) -> bool:
         """Check if cached data is still valid (not expired)"""
         meta_path = self._get_metadata_path(key)
@@ -79,31 +95,122 @@ class CacheManager:
             return None
 
         try:
-            with open(cache_path) as f:
-                return json.load(f)
-        except OSError, json.JSONDecodeError:
+            return pydantic_core.from_json(cache_path.read_bytes())
+        except OSError, ValueError:
             return None
 
-    def set(self, key: str, data: dict[str, Any]) -> None:
+    def set(self, key: str, data: dict[str, Any], etag: str | None = None) -> None:
         """
         Store data in cache
 
         Args:
             key: Cache key (usually the URL)
             data: Data to cache
+            etag: ETag the data was served with, used to revalidate it once expired
         """
         cache_path = self._get_cache_path(key)
         meta_path = self._get_metadata_path(key)
 
-        # Write data
-        with open(cache_path, "w") as f:
-            json.dump(data, f, indent=2)
+        # Write data (encoded once; the same bytes give the size)
+        data_bytes = pydantic_core.to_json(data, indent=2)
+        cache_path.write_bytes(data_bytes)
 
         # Write metadata
-        metadata = {"cached_at": datetime.now().isoformat(), "key": key, "size": len(json.dumps(data))}
+        metadata = {"cached_at": datetime.now().isoformat(), "key": key, "size": len(data_bytes)}
+        if etag:
+            metadata["etag"] = etag
+        with open(meta_path, "w") as f:
+            json.dump(metadata, f, indent=2)
+
+    def get_etag(self, key: str) -> str | None:
+        """
+        Get the ETag stored with cached data, expired or not
+
+        Args:
+            key: Cache key (usually the URL)
+
+        Returns:
+            The ETag or None if there is no cached data or it was stored without one
+        """
+        if not self._get_cache_path(key).exists():
+            return None
+
+        try:
+            with open(self._get_metadata_path(key)) as f:
+                return json.load(f).get("etag")
+        except OSError, ValueError:
+            return None
+
+    def touch(self, key: str) -> None:
+        """
+        Restart the TTL of cached data the origin confirmed is unchanged
+
+        Args:
+            key: Cache key (usually the URL)
+        """
+        meta_path = self._get_metadata_path(key)
+        with open(meta_path) as f:
+            metadata = json.load(f)
+        metadata["cached_at"] = datetime.now().isoformat()
         with open(meta_path, "w") as f:
             json.dump(metadata, f, indent=2)
 
+    def get_parsed(self, key: str) -> Any | None:
+        """
+        Get the (spec, registry) pair previously derived from the cached data for a key, skipping the JSON parse
+
+        Only returned while the cached data is valid and unchanged since set_parsed() was
+        called (checked against a BLAKE2b digest of its raw bytes). Stored as JSON, so
+        reading the file can never execute code. A malformed file is deleted so the caller
+        rebuilds from the spec instead of failing on it until the cache expires.
+
+        Args:
+            key: Cache key (usually the URL)
+
+        Returns:
+            [spec, registry] or None if missing, expired, stale or malformed
+        """
+        parsed_path = self._get_parsed_path(key)
+
+        if not parsed_path.exists() or not self._is_cache_valid(key):
+            return None
+
+        try:
+            raw_digest = hashlib.blake2b(self._get_cache_path(key).read_bytes()).hexdigest()
+            stored = pydantic_core.from_json(parsed_path.read_bytes())
+        except OSError:
+            return None
+        except ValueError:
+            parsed_path.unlink(missing_ok=True)
+            return None
+
+        if not isinstance(stored, dict):
+            parsed_path.unlink(missing_ok=True)
+            return None
+        if stored.get("digest") != raw_digest:
+            return None
+
+        payload = stored.get("payload")
+        if not _is_parsed_payload(payload):
+            parsed_path.unlink(missing_ok=True)
+            return None
+        return payload
+
+    def set_parsed(self, key: str, payload: Any) -> None:
+        """
+        Store the (spec, registry) pair derived from the cached data for a key
+
+        Args:
+            key: Cache key (usually the URL)
+            payload: (spec, registry) built from the cached data; comes back from get_parsed() as a list
+        """
+        cache_path = self._get_cache_path(key)
+        if not cache_path.exists():
+            return
+
+        raw_digest = hashlib.blake2b(cache_path.read_bytes()).hexdigest()
+        self._get_parsed_path(key).write_bytes(pydantic_core.to_json({"digest": raw_digest, "payload": payload}))
+
     def invalidate(self, key: str) -> None:
         """
         Invalidate (delete) cached data for a key
@@ -113,11 +220,14 @@ class CacheManager:
         """
         cache_path = self._get_cache_path(key)
         meta_path = self._get_metadata_path(key)
+        parsed_path = self._get_parsed_path(key)
 
         if cache_path.exists():
             cache_path.unlink()
         if meta_path.exists():
             meta_path.unlink()
+        if parsed_path.exists():
+            parsed_path.unlink()
 
     def clear_all(self) -> int:
         """
@@ -130,6 +240,9 @@ class CacheManager:
         for cache_file in self.cache_dir.glob("*.json"):
             cache_file.unlink()
             count += 1
+        # Also removes .parsed.pickle files left by earlier versions
+        for parsed_file in self.cache_dir.glob("*.parsed*"):
+            parsed_file.unlink()
         return count // 2  # Each entry has 2 files (data + metadata)
 
     def get_cache_info(self) -> dict[str, Any]:
@@ -207,13 +320,21 @@ async def fetch_with_cache(
             log(f"✓ Using cached data from: {url}")
             return cached_data
 
-    # Fetch from network (connect and default DEFAULT_FETCH_TIMEOUT, connect at least 30s)
+    # Fetch from network (connect and default DEFAULT_FETCH_TIMEOUT, connect at least 30s).
+    # With an ETag on file this is a conditional GET: an unchanged document comes back as 304 without a body.
     log(f"📡 Fetching from: {url}")
+    etag = cache_manager.get_etag(url)
+    headers = {"If-None-Match": etag} if etag else None
     try:
         timeout_config = httpx.Timeout(DEFAULT_FETCH_TIMEOUT, connect=30.0)
         async with asyncio.timeout(DEFAULT_FETCH_TIMEOUT):
             async with httpx.AsyncClient(follow_redirects=True, http2=True, timeout=timeout_config) as client:
-                response = await client.get(url)
+                response = await client.get(url, headers=headers)
+
+            if response.status_code == httpx.codes.NOT_MODIFIED and etag:
+                cache_manager.touch(url)
+                log(f"✓ Not modified, cache revalidated: {url}")
+                return await asyncio.to_thread(_read_json_path, cache_manager._get_cache_path(url))
 
             # Log if redirects occurred
             if len(response.history) > 0:
@@ -223,10 +344,11 @@ async def fetch_with_cache(
                 log(f"   Final: {response.url}")
 
             response.raise_for_status()
-            data = response.json()
+            # Parse the raw body directly: skips building a decoded str copy of a multi-MB spec
+            data = pydantic_core.from_json(response.content)
 
         # Cache the result
-        cache_manager.set(url, data)
+        cache_manager.set(url, data, etag=response.headers.get("ETag"))
         log(f"✓ Cached data from: {url}")
 
         return data
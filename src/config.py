@@ -32,6 +32,8 @@ class Config:
     # Server Configuration
     debug: bool = os.getenv("DEBUG", "false").lower() == "true"
     request_timeout: float = float(os.getenv("REQUEST_TIMEOUT", "30"))
+    # Max in-flight Marketplace API requests per process (bounds fan-out to the upstream API)
+    marketplace_max_concurrent_requests: int = int(os.getenv("MARKETPLACE_MAX_CONCURRENT_REQUESTS", "20"))
 
     # SSE Server Configuration (for cloud deployment)
     sse_enabled: bool = os.getenv("SSE_ENABLED", "false").lower() == "true"
@@ -47,6 +47,11 @@ class DocumentationCache:
         """Check if documentation cache is enabled"""
         return self.gitbook_client is not None
 
+    @property
+    def last_refresh(self) -> datetime | None:
+        """When the resource index was last rebuilt (None before the first refresh)"""
+        return self._last_refresh
+
     @property
     def needs_refresh(self) -> bool:
         """Check if cache needs refresh"""
@@ -125,10 +130,7 @@ class DocumentationCache:
                     "title": title,
                 }
 
-                if self.public_url and page_path:
-                    metadata["browser_url"] = f"{self.public_url}/{page_path}"
-
-                self._resources[uri] = {
+                resource = {
                     "uri": uri,
                     "name": title,
                     "description": f"Documentation page: {title}",
@@ -137,6 +139,12 @@ class DocumentationCache:
                     "content": None,  # Content will be fetched on-demand
                 }
 
+                # Also exposed top-level so listings can return these dicts without merging it in per call
+                if self.public_url and page_path:
+                    metadata["browser_url"] = resource["browser_url"] = f"{self.public_url}/{page_path}"
+
+                self._resources[uri] = resource
+
             pages = page.get("pages", [])
             if isinstance(pages, list):
                 for child_page in pages:
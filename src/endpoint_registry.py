@@ -1,11 +1,14 @@
 import asyncio
-import json
+import re
 import sys
+from functools import lru_cache
 from typing import Any
 
 import httpx
 
+from . import audit_fields
 from .cache_manager import CacheManager, fetch_with_cache
+from .mcp_tools import build_components_index, extract_parameter_info
 from .openapi_parser import OpenAPIParser
 
 
@@ -22,6 +25,16 @@ _endpoint_registries: dict[str, dict[str, dict[str, Any]]] = {}
 # Global OpenAPI specs per API base URL (for schema lookups)
 _openapi_specs: dict[str, dict[str, Any]] = {}
 
+# $ref index of each OpenAPI spec's components, per API base URL
+_components_indexes: dict[str, dict[str, Any]] = {}
+
+# marketplace_resource_schema results per API base URL, reset whenever that registry is rebuilt
+# Format: {api_base_url: {resource_id: schema_result}}
+_schema_caches: dict[str, dict[str, dict[str, Any]]] = {}
+
+# Per API base URL lock serializing registry builds
+_registry_locks: dict[str, asyncio.Lock] = {}
+
 # Global cache manager (shared across all endpoints)
 _cache_manager: CacheManager | None = None
 
@@ -118,6 +131,12 @@ async def fetch_openapi_spec(api_base_url: str, force_refresh: bool = False) ->
         raise
 
 
+_RESOURCE_ID_RE = re.compile(r"/public/v1/|/\{id\}|/")
+_RESOURCE_ID_REPLACEMENTS = {"/public/v1/": "", "/{id}": ".by_id", "/": "."}
+
+
+# Every tenant's spec shares the same paths, so conversions are reused across registry builds
+@lru_cache(maxsize=4096)
 def _path_to_resource_id(path: str) -> str:
     """
     Convert an API path to a resource identifier
@@ -127,16 +146,9 @@ def _path_to_resource_id(path: str) -> str:
         /public/v1/catalog/items/{id} -> catalog.items.by_id
         /public/v1/commerce/orders -> commerce.orders
     """
-    # Remove /public/v1/ prefix
-    path = path.replace("/public/v1/", "")
-
-    # Replace path parameters with descriptive names
-    path = path.replace("/{id}", ".by_id")
-
-    # Replace slashes with dots
-    resource_id = path.replace("/", ".")
-
-    return resource_id
+    # One pass: drop the /public/v1/ prefix, /{id} -> .by_id, remaining slashes -> dots
+    # Interned: the same IDs key the registry, the resource enum and every lookup
+    return sys.intern(_RESOURCE_ID_RE.sub(lambda m: _RESOURCE_ID_REPLACEMENTS[m.group(0)], path))
 
 
 async def get_endpoints_registry(api_base_url: str, force_refresh: bool = False) -> dict[str, dict[str, Any]]:
@@ -158,6 +170,15 @@ async def get_endpoints_registry(api_base_url: str, force_refresh: bool = False)
         _log(f"✓ Using cached endpoints registry for {api_base_url}")
         return _endpoint_registries[api_base_url]
 
+    # One build per base URL: concurrent cold requests wait for it instead of each fetching the spec
+    async with _registry_locks.setdefault(api_base_url, asyncio.Lock()):
+        if api_base_url in _endpoint_registries and not force_refresh:
+            return _endpoint_registries[api_base_url]
+        return await _build_endpoints_registry(api_base_url, force_refresh)
+
+
+async def _build_endpoints_registry(api_base_url: str, force_refresh: bool) -> dict[str, dict[str, Any]]:
+    """Fetch the spec for api_base_url and (re)build its registry and derived caches (caller holds its lock)."""
     _log(f"🔄 Initializing endpoints registry for {api_base_url}")
 
     try:
@@ -166,36 +187,36 @@ async def get_endpoints_registry(api_base_url: str, force_refresh: bool = False)
 
         # Store the full OpenAPI spec for schema lookups
         _openapi_specs[api_base_url] = spec
+        _components_indexes[api_base_url] = build_components_index(spec)
 
         # Parse the OpenAPI spec
         parser = OpenAPIParser()
-        tools = parser.extract_get_endpoints(spec)
+        endpoints = parser.extract_endpoint_infos(spec)
 
         # Build the registry with richer metadata
         registry: dict[str, dict[str, Any]] = {}
 
-        for tool in tools:
-            tool_info = json.loads(tool.description)
-            path = tool_info.get("path", "")
-
+        for endpoint in endpoints:
             # Create a resource identifier from the path
-            resource_id = _path_to_resource_id(path)
+            resource_id = _path_to_resource_id(endpoint.path)
+            enum_fields, path_params_info = extract_parameter_info(endpoint.parameters)
 
             registry[resource_id] = {
-                "path": path,
-                "summary": tool_info.get("summary", ""),
-                "description": tool_info.get("description", ""),
-                "parameters": tool_info.get("parameters", []),
-                "response": tool_info.get("response", {}),
+                "path": endpoint.path,
+                "summary": endpoint.summary,
+                "description": endpoint.description,
+                "parameters": endpoint.parameters,
+                "response": endpoint.responses,
+                "enum_fields": enum_fields,
+                "path_params_info": path_params_info,
             }
 
         # Cache the registry
         _endpoint_registries[api_base_url] = registry
+        _schema_caches[api_base_url] = {}
 
         # Build audit fields cache from spec (for auto-add regex and marketplace_audit_fields tool)
         try:
-            from . import audit_fields
-
             await asyncio.to_thread(audit_fields.update_cache, api_base_url, spec, _path_to_resource_id)
             _log(f"✓ Audit fields cache updated for {api_base_url}")
         except Exception as audit_err:
@@ -210,6 +231,7 @@ async def get_endpoints_registry(api_base_url: str, force_refresh: bool = False)
         _log(f"❌ Failed to initialize endpoints registry for {api_base_url}: {e}")
         # Return empty registry on failure
         _endpoint_registries[api_base_url] = {}
+        _schema_caches.pop(api_base_url, None)
         return {}
 
 
@@ -221,17 +243,47 @@ def clear_registry(api_base_url: str | None = None):
         api_base_url: If provided, clear only this endpoint's registry.
                      If None, clear all registries.
     """
-    global _endpoint_registries
+    global _endpoint_registries, _schema_caches
 
     if api_base_url:
+        _schema_caches.pop(api_base_url, None)
         if api_base_url in _endpoint_registries:
             del _endpoint_registries[api_base_url]
             _log(f"✓ Cleared registry for {api_base_url}")
     else:
         _endpoint_registries = {}
+        _schema_caches = {}
         _log("✓ Cleared all endpoint registries")
 
 
+def get_components_index(api_base_url: str) -> dict[str, Any]:
+    """
+    Get the components $ref index for an API base URL's OpenAPI spec
+
+    Args:
+        api_base_url: The base URL of the API
+
+    Returns:
+        Dictionary mapping "#/components/<kind>/<name>" refs to objects (empty if the spec is not loaded)
+    """
+    return _components_indexes.get(api_base_url, {})
+
+
+def get_schema_cache(api_base_url: str) -> dict[str, dict[str, Any]]:
+    """
+    Get the per-resource schema result cache for an API base URL
+
+    The returned dict is replaced when the registry is rebuilt, so entries never outlive their spec.
+
+    Args:
+        api_base_url: The base URL of the API
+
+    Returns:
+        Dictionary mapping resource IDs to cached marketplace_resource_schema results
+    """
+    return _schema_caches.setdefault(api_base_url, {})
+
+
 def get_all_registries() -> dict[str, dict[str, dict[str, Any]]]:
     """
     Get all cached endpoint registries
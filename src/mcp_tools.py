@@ -2,10 +2,14 @@ from __future__ import annotations
 
 import logging
 import re
+from collections import defaultdict
+from functools import cache
+from itertools import islice
 from typing import TYPE_CHECKING, Any
 
 import httpx
 
+from .audit_fields import FALLBACK_STATIC_REGEX, _get_item_schema, _resolve_schema
 from .query_templates import get_query_templates
 
 if TYPE_CHECKING:
@@ -19,6 +23,11 @@ MEDIA_TYPE_JSON = "application/json"
 # SoftwareOne API response key for metadata (pagination, omitted fields, etc.)
 KEY_META = "$meta"
 
+# {param} placeholders in OpenAPI paths
+_PATH_PARAM_RE = re.compile(r"\{(\w+)\}")
+# Spaces after commas in RQL (the API rejects "and(a, b)")
+_RQL_COMMA_SPACE_RE = re.compile(r",\s+")
+
 
 def obfuscate_token_values(data: Any) -> Any:
     """
@@ -50,6 +59,30 @@ def obfuscate_token_values(data: Any) -> Any:
         return data
 
 
+# ============================================================================
+# $ref lookup: index components once per spec instead of walking the spec per call
+# ============================================================================
+
+
+def build_components_index(openapi_spec: dict[str, Any]) -> dict[str, Any]:
+    """Map every local component ref (e.g. #/components/schemas/Order) to its object. Build once per loaded spec."""
+    components = openapi_spec.get("components") or {}
+    return {f"#/components/{kind}/{name}": obj for kind, objs in components.items() if isinstance(objs, dict) for name, obj in objs.items()}
+
+
+def _resolve_spec_ref(openapi_spec: dict[str, Any], ref: str, components_index: dict[str, Any] | None) -> Any:
+    """Resolve a local $ref with a single index lookup, falling back to walking the spec for refs outside components."""
+    if components_index:
+        found = components_index.get(ref)
+        if found is not None:
+            return found
+    ref_schema = openapi_spec
+    for part in ref.split("/"):
+        if part and part != "#":
+            ref_schema = ref_schema.get(part, {})
+    return ref_schema
+
+
 # ============================================================================
 # Select sanitization: ensure id is always included and drop fields not in schema
 # ============================================================================
@@ -59,12 +92,11 @@ def _get_allowed_select_fields(
     openapi_spec: dict[str, Any],
     endpoints_registry: dict[str, Any],
     resource: str,
+    components_index: dict[str, Any] | None = None,
 ) -> set[str]:
     """Return the set of top-level property names allowed in select for this resource (from GET response item schema)."""
     if resource not in endpoints_registry or not openapi_spec:
         return set()
-    from .audit_fields import _get_item_schema, _resolve_schema
-
     endpoint_info = endpoints_registry[resource]
     path = endpoint_info.get("path")
     if not path:
@@ -80,12 +112,7 @@ def _get_allowed_select_fields(
     if not schema or not isinstance(schema, dict):
         return set()
     if "$ref" in schema:
-        ref_path = schema["$ref"].split("/")
-        ref_schema = openapi_spec
-        for part in ref_path:
-            if part and part != "#":
-                ref_schema = ref_schema.get(part, {})
-        schema = ref_schema
+        schema = _resolve_spec_ref(openapi_spec, schema["$ref"], components_index)
     item_schema = _get_item_schema(openapi_spec, schema)
     item_schema = _resolve_schema(openapi_spec, item_schema) if isinstance(item_schema, dict) else item_schema
     if not isinstance(item_schema, dict):
@@ -126,7 +153,7 @@ def _sanitize_select(
     # Top-level field name for validation (strip +/-, take segment before first dot)
     def top_level_field(part: str) -> str:
         name = part.lstrip("+-")
-        return name.split(".")[0] if "." in name else name
+        return name.partition(".")[0]
 
     kept: list[str] = []
     dropped: list[str] = []
@@ -168,6 +195,22 @@ def _sanitize_select(
 # ============================================================================
 
 
+def _build_query_params(
+    rql: str | None,
+    limit: int | None,
+    offset: int | None,
+    page: int | None,
+    select: str | None,
+    order: str | None,
+) -> dict[str, Any]:
+    """Build APIClient query params, dropping unset values. Empty strings count as unset; 0 is a valid limit/offset/page."""
+    return {
+        name: value
+        for name, value in (("rql", rql or None), ("limit", limit), ("offset", offset), ("page", page), ("select", select or None), ("order", order or None))
+        if value is not None
+    }
+
+
 async def execute_marketplace_query(
     resource: str,
     rql: str,
@@ -184,6 +227,7 @@ async def execute_marketplace_query(
     config: Any = None,
     audit_regex: re.Pattern[str] | None = None,
     openapi_spec: dict[str, Any] | None = None,
+    components_index: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
     """
     Core logic for marketplace_query tool.
@@ -202,6 +246,9 @@ async def execute_marketplace_query(
         log_fn: Optional logging function
         analytics_logger: Optional analytics logger instance
         config: Optional config object for checking if analytics is enabled
+        audit_regex: Optional precompiled audit field regex for this API
+        openapi_spec: Optional OpenAPI spec used to sanitize select
+        components_index: Optional index from build_components_index(openapi_spec)
 
     Returns:
         API response or error dictionary
@@ -215,7 +262,7 @@ async def execute_marketplace_query(
         (rql or "")[:80],
         limit,
     )
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
     params = {"resource": resource, "rql": rql, "limit": limit, "offset": offset, "page": page, "select": select, "order": order, "path_params": path_params}
 
     def log(message: str):
@@ -237,7 +284,7 @@ async def execute_marketplace_query(
             error_response = {
                 "error": f"Unknown resource: '{resource}'",
                 "hint": "Use marketplace_resources() to see all available resources",
-                "available_categories": list({r.split(".")[0] for r in endpoints_registry}),
+                "available_categories": list({r.partition(".")[0] for r in endpoints_registry}),
             }
 
             if similar_resources[:5]:  # Show up to 5 suggestions
@@ -248,14 +295,12 @@ async def execute_marketplace_query(
         endpoint_info = endpoints_registry[resource]
         api_path = endpoint_info["path"]
 
-        # Replace path parameters (e.g., {id}, {productId}, etc.)
+        # Replace path parameters (e.g., {id}, {productId}, etc.) in one pass; unknown ones are left as-is
         if path_params:
-            for param_name, param_value in path_params.items():
-                # Replace {param_name} in the path
-                api_path = api_path.replace(f"{{{param_name}}}", str(param_value))
+            api_path = _PATH_PARAM_RE.sub(lambda m: str(path_params[m[1]]) if m[1] in path_params else m[0], api_path)
 
         # Check if there are still unresolved path parameters
-        remaining_params = re.findall(r"\{(\w+)\}", api_path)
+        remaining_params = _PATH_PARAM_RE.findall(api_path)
         if remaining_params:
             # Create example path_params dict with realistic examples
             example_values = {
@@ -293,8 +338,6 @@ async def execute_marketplace_query(
         # Auto-detect audit field usage in RQL and ensure audit is selected
         # The API requires select=audit when filtering/sorting by audit fields
         # Use dynamic regex from spec-derived cache if provided, else fallback (includes failed)
-        from .audit_fields import FALLBACK_STATIC_REGEX
-
         _audit_pattern = audit_regex if audit_regex is not None else FALLBACK_STATIC_REGEX
         uses_audit_fields = bool(rql and _audit_pattern.search(rql))
         uses_audit_in_order = bool(order and "audit" in order.lower())
@@ -323,7 +366,7 @@ async def execute_marketplace_query(
 
         # Sanitize select: drop fields not in resource schema and ensure id is always included
         if select:
-            allowed = _get_allowed_select_fields(openapi_spec or {}, endpoints_registry, resource)
+            allowed = _get_allowed_select_fields(openapi_spec or {}, endpoints_registry, resource, components_index)
             select = _sanitize_select(select, allowed, log) or select
 
         # Apply default limit of 10 if not explicitly specified
@@ -339,22 +382,11 @@ async def execute_marketplace_query(
             limit = 100
 
         # Build query parameters
-        params = {}
         if rql:
             # Sanitize RQL: remove spaces after commas in function calls (e.g. "and(..., ilike(..." -> "and(...,ilike(...")
             # This prevents 400 errors from the API which is strict about RQL syntax
-            rql = re.sub(r",\s+", ",", rql)
-            params["rql"] = rql
-        if limit is not None:
-            params["limit"] = limit
-        if offset is not None:
-            params["offset"] = offset
-        if page is not None:
-            params["page"] = page
-        if select:
-            params["select"] = select
-        if order:
-            params["order"] = order
+            rql = _RQL_COMMA_SPACE_RE.sub(",", rql)
+        params = _build_query_params(rql, limit, offset, page, select, order)
 
         log(f"📊 Query: {resource}")
         log(f"   Path: {api_path}")
@@ -382,7 +414,7 @@ async def execute_marketplace_query(
                     api_path=api_path,
                     api_method="GET",
                     api_status_code=200,
-                    api_response_time_ms=int((time.time() - start_time) * 1000),
+                    api_response_time_ms=(time.perf_counter_ns() - start_ns) // 1_000_000,
                     result_count=result_count,
                     rql_filter=rql,
                     limit_value=limit,
@@ -444,19 +476,7 @@ async def execute_marketplace_query(
             # Retry without auto-added audit if we got a 400
             if should_retry_without_audit:
                 log(f"   🔄 Retrying query without auto-added 'audit' (using original select: {original_select or 'None'})")
-                retry_params = {}
-                if rql:
-                    retry_params["rql"] = rql
-                if limit is not None:
-                    retry_params["limit"] = limit
-                if offset is not None:
-                    retry_params["offset"] = offset
-                if page is not None:
-                    retry_params["page"] = page
-                if original_select:
-                    retry_params["select"] = original_select
-                if order:
-                    retry_params["order"] = order
+                retry_params = _build_query_params(rql, limit, offset, page, original_select, order)
 
                 try:
                     result = await api_client.get(api_path, params=retry_params)
@@ -480,7 +500,7 @@ async def execute_marketplace_query(
                             api_path=api_path,
                             api_method="GET",
                             api_status_code=200,
-                            api_response_time_ms=int((time.time() - start_time) * 1000),
+                            api_response_time_ms=(time.perf_counter_ns() - start_ns) // 1_000_000,
                             result_count=result_count,
                             rql_filter=rql,
                             limit_value=limit,
@@ -508,7 +528,7 @@ async def execute_marketplace_query(
                     api_path=api_path,
                     api_method="GET",
                     api_status_code=response_code or 500,
-                    api_response_time_ms=int((time.time() - start_time) * 1000),
+                    api_response_time_ms=(time.perf_counter_ns() - start_ns) // 1_000_000,
                     rql_filter=rql,
                     limit_value=limit,
                     offset_value=offset,
@@ -523,7 +543,7 @@ async def execute_marketplace_query(
         if analytics_logger and config and config.analytics_enabled:
             await analytics_logger.log_tool_call(
                 tool_name="marketplace_query",
-                response_time_ms=int((time.time() - start_time) * 1000),
+                response_time_ms=(time.perf_counter_ns() - start_ns) // 1_000_000,
                 success=False,
                 error_type="exception",
                 error_message=str(outer_e),
@@ -536,10 +556,13 @@ async def execute_marketplace_query(
 # ============================================================================
 
 
+@cache
 def execute_marketplace_quick_queries() -> dict[str, Any]:
     """
     Core logic for marketplace_quick_queries tool.
 
+    The templates are static, so they are built once and the same dict is returned on every call (treat as read-only).
+
     Returns:
         Dictionary of query templates organized by category
     """
@@ -568,11 +591,9 @@ def execute_marketplace_resources(
         Detailed resource catalog organized by category
     """
     # Build enhanced categories with more metadata
-    categories = {}
+    categories: defaultdict[str, list[dict[str, Any]]] = defaultdict(list)
     for resource_name, endpoint_info in endpoints_registry.items():
-        category = resource_name.split(".")[0]
-        if category not in categories:
-            categories[category] = []
+        category = resource_name.partition(".")[0]
 
         # Build resource entry with enhanced information
         resource_entry = {
@@ -635,7 +656,7 @@ def execute_marketplace_resources(
         "api_endpoint": api_base_url,
         "user": user_id or "unknown",
         "total_resources": len(endpoints_registry),
-        "categories": categories,
+        "categories": dict(categories),
         "usage": {
             "query_resource": "Use marketplace_query(resource='category.resource', ...) to query any resource",
             "get_schema": "Use marketplace_resource_schema(resource='...') to see full field list and types",
@@ -665,33 +686,20 @@ def execute_marketplace_resources(
 # ============================================================================
 
 
-def execute_marketplace_resource_info(
-    resource: str,
-    endpoints_registry: dict[str, Any],
-) -> dict[str, Any]:
+def extract_parameter_info(parameters: list[dict[str, Any]]) -> tuple[dict[str, Any], dict[str, Any]]:
     """
-    Core logic for marketplace_resource_info tool.
+    Split an endpoint's parameters into query enum values and path parameter info.
 
-    Args:
-        resource: The resource to get information about
-        endpoints_registry: Registry of available endpoints
+    Registries call this once per endpoint when they are built so marketplace_resource_info
+    does not loop over the parameters on every call.
 
     Returns:
-        Detailed resource information
+        (enum_fields, path_params_info)
     """
-    if resource not in endpoints_registry:
-        return {
-            "error": f"Unknown resource: {resource}",
-            "hint": "Use marketplace_resources() to see all available resources",
-        }
-
-    endpoint_info = endpoints_registry[resource]
-
-    # Extract enum values from parameters
     enum_fields = {}
     path_params_info = {}
 
-    for param in endpoint_info.get("parameters", []):
+    for param in parameters:
         param_name = param.get("name")
         param_in = param.get("in")
         param_schema = param.get("schema", {})
@@ -708,6 +716,38 @@ def execute_marketplace_resource_info(
         if "enum" in param_schema and param_in == "query":
             enum_fields[param_name] = param_schema["enum"]
 
+    return enum_fields, path_params_info
+
+
+def execute_marketplace_resource_info(
+    resource: str,
+    endpoints_registry: dict[str, Any],
+) -> dict[str, Any]:
+    """
+    Core logic for marketplace_resource_info tool.
+
+    Args:
+        resource: The resource to get information about
+        endpoints_registry: Registry of available endpoints
+
+    Returns:
+        Detailed resource information
+    """
+    if resource not in endpoints_registry:
+        return {
+            "error": f"Unknown resource: {resource}",
+            "hint": "Use marketplace_resources() to see all available resources",
+        }
+
+    endpoint_info = endpoints_registry[resource]
+
+    # Registries built at init carry these precomputed; fall back for hand-built entries
+    if "enum_fields" in endpoint_info and "path_params_info" in endpoint_info:
+        enum_fields = endpoint_info["enum_fields"]
+        path_params_info = endpoint_info["path_params_info"]
+    else:
+        enum_fields, path_params_info = extract_parameter_info(endpoint_info.get("parameters", []))
+
     # Find related resources (children and siblings)
     related_resources = {"children": [], "parent": None, "siblings": []}
 
@@ -754,7 +794,7 @@ def execute_marketplace_resource_info(
 
     # Add example with enum filter if available
     if enum_fields:
-        first_enum_field = list(enum_fields.keys())[0]
+        first_enum_field = next(iter(enum_fields))
         first_enum_value = enum_fields[first_enum_field][0]
         examples.append(f"marketplace_query(resource='{resource}', rql='eq({first_enum_field},{first_enum_value})', limit=10)")
 
@@ -786,7 +826,7 @@ def execute_marketplace_resource_info(
     # Add enum fields if any found
     if enum_fields:
         result["enum_fields"] = enum_fields
-        result["filtering_tips"] = f"Filter by {', '.join(enum_fields.keys())} using RQL: eq({list(enum_fields.keys())[0]},<value>)"
+        result["filtering_tips"] = f"Filter by {', '.join(enum_fields.keys())} using RQL: eq({next(iter(enum_fields))},<value>)"
 
     # Add path parameters info if any found
     if path_params_info:
@@ -816,6 +856,7 @@ def execute_marketplace_resource_schema(
     resource: str,
     openapi_spec: dict[str, Any],
     endpoints_registry: dict[str, Any],
+    components_index: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
     """
     Core logic for marketplace_resource_schema tool.
@@ -824,6 +865,7 @@ def execute_marketplace_resource_schema(
         resource: The resource to get the schema for
         openapi_spec: The full OpenAPI specification
         endpoints_registry: Registry of available endpoints
+        components_index: Optional index from build_components_index(openapi_spec)
 
     Returns:
         Complete JSON schema with field types and descriptions
@@ -832,7 +874,7 @@ def execute_marketplace_resource_schema(
         return {
             "error": f"Unknown resource: {resource}",
             "hint": "Use marketplace_resources() to see all available resources",
-            "available_categories": list({r.split(".")[0] for r in endpoints_registry}),
+            "available_categories": list({r.partition(".")[0] for r in endpoints_registry}),
         }
 
     endpoint_info = endpoints_registry[resource]
@@ -869,12 +911,7 @@ def execute_marketplace_resource_schema(
 
                 # If schema references components, try to resolve it
                 if "$ref" in schema:
-                    ref_path = schema["$ref"].split("/")
-                    ref_schema = openapi_spec
-                    for part in ref_path:
-                        if part and part != "#":
-                            ref_schema = ref_schema.get(part, {})
-                    schema = ref_schema
+                    schema = _resolve_spec_ref(openapi_spec, schema["$ref"], components_index)
 
                 schema_info["response_schema"] = schema
 
@@ -899,23 +936,24 @@ def execute_marketplace_resource_schema(
 
                         # For nested objects, show structure
                         if field_schema.get("type") == "object" and "properties" in field_schema:
-                            nested_fields = {}
-                            for nested_name, nested_schema in list(field_schema["properties"].items())[:5]:
-                                nested_fields[nested_name] = {
+                            field_info["nested_fields"] = {
+                                nested_name: {
                                     "type": nested_schema.get("type", "unknown"),
                                     "description": nested_schema.get("description", ""),
                                 }
-                            field_info["nested_fields"] = nested_fields
+                                for nested_name, nested_schema in islice(field_schema["properties"].items(), 5)
+                            }
 
                         fields[field_name] = field_info
 
                     schema_info["fields"] = fields
 
                     # Add filtering hints
+                    # islice: only the first few fields are looked at, so don't copy every field into a list
                     schema_info["filtering_hints"] = {
-                        "simple_filters": [f"eq({f},value)" for f in list(fields.keys())[:5]],
-                        "search_fields": [f"ilike({f},*keyword*)" for f, info in list(fields.items())[:3] if info.get("type") == "string"],
-                        "enum_filters": [f"eq({f},{info['enum'][0]})" for f, info in fields.items() if "enum" in info][:3],
+                        "simple_filters": [f"eq({f},value)" for f in islice(fields, 5)],
+                        "search_fields": [f"ilike({f},*keyword*)" for f, info in islice(fields.items(), 3) if info.get("type") == "string"],
+                        "enum_filters": list(islice((f"eq({f},{info['enum'][0]})" for f, info in fields.items() if "enum" in info), 3)),
                     }
 
     # Add common query patterns
@@ -1,8 +1,38 @@
-import json
-from typing import Any
+from __future__ import annotations
 
+from itertools import islice
+from typing import TYPE_CHECKING, Any
+
+import pydantic_core
 from mcp.types import Tool
 
+from .models import EndpointInfo
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+def prune_spec_to_get_operations(spec: dict[str, Any]) -> dict[str, Any]:
+    """
+    Return a copy of the spec that keeps only what GET lookups need
+
+    Path items are reduced to their GET operation (and shared path-level parameters); top-level
+    sections such as components and info are kept as-is. Non-GET operations are dropped, so a
+    long-lived holder of the result does not keep them alive.
+
+    Args:
+        spec: OpenAPI specification dictionary
+
+    Returns:
+        Pruned specification dictionary (sub-objects are shared with the input, not copied)
+    """
+    paths = {
+        path: {key: path_item[key] for key in ("get", "parameters") if key in path_item}
+        for path, path_item in spec.get("paths", {}).items()
+        if isinstance(path_item, dict) and "get" in path_item
+    }
+    return {**spec, "paths": paths}
+
 
 class OpenAPIParser:
     """Parse OpenAPI specifications and extract GET endpoints"""
@@ -58,6 +88,38 @@ class OpenAPIParser:
             sanitized = "tool"
         return sanitized
 
+    def _iter_get_operations(self, spec: dict[str, Any]) -> Iterator[tuple[str, dict[str, Any]]]:
+        """Yield (path, GET operation) pairs for included paths"""
+        for path, path_item in spec.get("paths", {}).items():
+            if self._should_include_path(path) and "get" in path_item:
+                yield path, path_item["get"]
+
+    def extract_endpoint_infos(self, spec: dict[str, Any]) -> list[EndpointInfo]:
+        """
+        Extract endpoint metadata for all GET endpoints without building MCP tools
+
+        Use this when only the metadata is needed (e.g. building an endpoints registry):
+        it skips the input schema and the JSON round-trip through Tool.description.
+
+        Args:
+            spec: OpenAPI specification dictionary
+
+        Returns:
+            List of EndpointInfo objects for GET endpoints
+        """
+        # Values come straight from the parsed spec, so skip pydantic validation
+        return [
+            EndpointInfo.model_construct(
+                method="GET",
+                path=path,
+                summary=get_op.get("summary", f"GET {path}"),
+                description=get_op.get("description", ""),
+                parameters=get_op.get("parameters", []),
+                responses=self._extract_response_info(get_op),
+            )
+            for path, get_op in self._iter_get_operations(spec)
+        ]
+
     def extract_get_endpoints(self, spec: dict[str, Any]) -> list[Tool]:
         """
         Extract all GET endpoints from OpenAPI spec and convert to MCP tools
@@ -69,17 +131,8 @@ class OpenAPIParser:
             List of MCP Tool objects for GET endpoints
         """
         tools = []
-        paths = spec.get("paths", {})
-
-        for path, path_item in paths.items():
-            if not self._should_include_path(path):
-                continue
-
-            if "get" not in path_item:
-                continue
-
-            get_op = path_item["get"]
 
+        for path, get_op in self._iter_get_operations(spec):
             operation_id = get_op.get("operationId", path.replace("/", "_").strip("_"))
             operation_id = self._sanitize_tool_name(operation_id)
             summary = get_op.get("summary", f"GET {path}")
@@ -104,7 +157,7 @@ class OpenAPIParser:
             # additionalProperties allows passing any query params, including RQL expressions
             tool = Tool(
                 name=operation_id,
-                description=json.dumps(tool_description),
+                description=pydantic_core.to_json(tool_description).decode(),
                 inputSchema={
                     "type": "object",
                     "properties": input_schema.get("properties", {}),
@@ -145,7 +198,7 @@ class OpenAPIParser:
 
         if "properties" in schema and isinstance(schema["properties"], dict):
             simplified["properties"] = {}
-            for prop_name, prop_schema in list(schema["properties"].items())[:10]:  # Limit to 10 properties
+            for prop_name, prop_schema in islice(schema["properties"].items(), 10):  # Limit to 10 properties
                 simplified["properties"][prop_name] = self._simplify_schema(prop_schema, max_depth, current_depth + 1)
 
         if "items" in schema:
@@ -419,7 +472,7 @@ class OpenAPIParser:
             # Create MCP Tool
             tool = Tool(
                 name=name,
-                description=json.dumps(tool_description),
+                description=pydantic_core.to_json(tool_description).decode(),
                 inputSchema={
                     "type": "object",
                     "properties": input_schema.get("properties", {}),
@@ -1,11 +1,15 @@
 #!/usr/bin/env python3
 
+from __future__ import annotations
+
 import asyncio
 import concurrent.futures
 import logging
 import os
 import sys
 import warnings
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any
 
 # Set before importing FastMCP so stateless HTTP is used (required for load-balanced/cloud deployment).
 os.environ["FASTMCP_STATELESS_HTTP"] = "true"
@@ -22,12 +26,17 @@ from starlette.responses import JSONResponse
 from alembic import command
 
 from .analytics import get_analytics_logger, initialize_analytics
+from .api_client import close_shared_client
 from .config import config
 from .server_context import log
 from .server_docs import initialize_documentation_cache
 from .server_middleware import CredentialsMiddleware
 from .server_resources import register_http_resources
 from .server_tools import register_http_tools
+from .token_validator import close_http_client
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
 
 warnings.filterwarnings("ignore", category=DeprecationWarning, module="websockets")
 warnings.filterwarnings("ignore", category=DeprecationWarning, message=".*websockets.*deprecated.*")
@@ -41,7 +50,18 @@ print(f"🌐 Configured for {server_host}:{server_port}", file=sys.stderr, flush
 # Docs cache is populated at startup and remains in memory for all requests in that process.
 log("📡 FASTMCP_STATELESS_HTTP=true (stateless always; docs cache in-process, long-lived per instance)")
 
-mcp = FastMCP("softwareone-marketplace", stateless_http=True)
+
+@asynccontextmanager
+async def _lifespan(server: FastMCP) -> AsyncIterator[dict[str, Any]]:
+    """Close the pooled upstream connections (Marketplace API and token validation) on shutdown."""
+    try:
+        yield {}
+    finally:
+        await close_shared_client()
+        await close_http_client()
+
+
+mcp = FastMCP("softwareone-marketplace", stateless_http=True, lifespan=_lifespan)
 register_http_tools(mcp)
 register_http_resources(mcp)
 
@@ -62,4 +62,6 @@ async def get_client_api_client_http(validate_token: bool = True) -> APIClient:
             log(f"✅ Token validated for {endpoint} - Account: {account_name} ({account_id})")
         else:
             log(f"✅ Token validated for {endpoint}")
-    return APIClient(base_url=endpoint, token=token)
+    # Built per call so the caller's token is not kept after the request; the connection pool is
+    # shared across clients and closed once, on shutdown (see server._lifespan)
+    return APIClient(base_url=endpoint, token=token, shared_pool=True)
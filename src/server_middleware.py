@@ -44,7 +44,7 @@ class CredentialsMiddleware:
             elif "claude" in user_agent.lower():
                 client_info = "Claude Desktop"
             elif user_agent:
-                client_info = user_agent.split("/")[0][:50]
+                client_info = user_agent.partition("/")[0][:50]
 
             client_ip = None
             forwarded_for = request.headers.get("x-forwarded-for")
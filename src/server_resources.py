@@ -2,6 +2,8 @@ import json
 import time
 from typing import Any
 
+import pydantic_core
+
 from . import endpoint_registry, server_docs
 from .analytics import get_analytics_logger
 from .config import config
@@ -11,7 +13,7 @@ from .server_context import get_current_credentials
 async def get_openapi_spec() -> str:
     """Return OpenAPI spec for the current endpoint (requires auth)."""
     analytics = get_analytics_logger()
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
     uri = "api://openapi.json"
     token, endpoint = get_current_credentials()
     if not token:
@@ -27,7 +29,7 @@ async def get_openapi_spec() -> str:
             await analytics.log_resource_read(
                 resource_uri=uri,
                 success=False,
-                response_time_ms=int((time.time() - start_time) * 1000),
+                response_time_ms=(time.perf_counter_ns() - start_ns) // 1_000_000,
                 error_message="Authentication required",
             )
         return error_response
@@ -47,7 +49,7 @@ async def get_openapi_spec() -> str:
             await analytics.log_resource_read(
                 resource_uri=uri,
                 success=False,
-                response_time_ms=int((time.time() - start_time) * 1000),
+                response_time_ms=(time.perf_counter_ns() - start_ns) // 1_000_000,
                 error_message=f"Invalid credentials: {error}",
             )
         return error_response
@@ -67,7 +69,7 @@ async def get_openapi_spec() -> str:
                 await analytics.log_resource_read(
                     resource_uri=uri,
                     success=False,
-                    response_time_ms=int((time.time() - start_time) * 1000),
+                    response_time_ms=(time.perf_counter_ns() - start_ns) // 1_000_000,
                     error_message="OpenAPI specification not available",
                 )
             return error_response
@@ -83,10 +85,11 @@ async def get_openapi_spec() -> str:
             await analytics.log_resource_read(
                 resource_uri=uri,
                 success=True,
-                response_time_ms=int((time.time() - start_time) * 1000),
+                response_time_ms=(time.perf_counter_ns() - start_ns) // 1_000_000,
                 cache_hit=cache_hit,
             )
-        return json.dumps(spec_with_metadata, indent=2)
+        # The spec is the largest payload we serve; pydantic_core (Rust) encodes it much faster than stdlib json
+        return pydantic_core.to_json(spec_with_metadata, indent=2).decode()
     except Exception as e:
         error_response = json.dumps(
             {"error": "Failed to fetch OpenAPI specification", "message": str(e), "endpoint": endpoint},
@@ -96,7 +99,7 @@ async def get_openapi_spec() -> str:
             await analytics.log_resource_read(
                 resource_uri=uri,
                 success=False,
-                response_time_ms=int((time.time() - start_time) * 1000),
+                response_time_ms=(time.perf_counter_ns() - start_ns) // 1_000_000,
                 error_message=str(e),
             )
         return error_response
@@ -118,7 +121,7 @@ def register_http_resources(mcp: Any) -> None:
     )
     async def get_documentation_resource(path: str) -> str:
         analytics = get_analytics_logger()
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         uri = f"docs://{path}"
         try:
             await server_docs.initialize_documentation_cache()
@@ -129,7 +132,7 @@ def register_http_resources(mcp: Any) -> None:
                     await analytics.log_resource_read(
                         resource_uri=uri,
                         success=False,
-                        response_time_ms=int((time.time() - start_time) * 1000),
+                        response_time_ms=(time.perf_counter_ns() - start_ns) // 1_000_000,
                         error_message=error_msg,
                     )
                 return error_msg
@@ -145,7 +148,7 @@ def register_http_resources(mcp: Any) -> None:
                     await analytics.log_resource_read(
                         resource_uri=uri,
                         success=False,
-                        response_time_ms=int((time.time() - start_time) * 1000),
+                        response_time_ms=(time.perf_counter_ns() - start_ns) // 1_000_000,
                         error_message="Documentation page not found",
                     )
                 return error_msg
@@ -153,7 +156,7 @@ def register_http_resources(mcp: Any) -> None:
                 await analytics.log_resource_read(
                     resource_uri=uri,
                     success=True,
-                    response_time_ms=int((time.time() - start_time) * 1000),
+                    response_time_ms=(time.perf_counter_ns() - start_ns) // 1_000_000,
                     cache_hit=cache_hit,
                 )
             return content
@@ -162,7 +165,7 @@ def register_http_resources(mcp: Any) -> None:
                 await analytics.log_resource_read(
                     resource_uri=uri,
                     success=False,
-                    response_time_ms=int((time.time() - start_time) * 1000),
+                    response_time_ms=(time.perf_counter_ns() - start_ns) // 1_000_000,
                     error_message=str(e),
                 )
             raise
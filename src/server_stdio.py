@@ -1,37 +1,85 @@
 #!/usr/bin/env python3
 
-import json
+from __future__ import annotations
+
+import asyncio
+import logging
 import sys
-from typing import Any
+from contextlib import asynccontextmanager
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any
 
 from fastmcp import FastMCP
 
+from . import audit_fields
 from .api_client import APIClient
 from .cache_manager import CacheManager, fetch_with_cache
 from .config import config
+from .endpoint_registry import _path_to_resource_id
 from .mcp_tools import (
+    build_components_index,
     execute_marketplace_query,
     execute_marketplace_quick_queries,
     execute_marketplace_resource_info,
     execute_marketplace_resource_schema,
     execute_marketplace_resources,
+    extract_parameter_info,
 )
-from .openapi_parser import OpenAPIParser
+from .openapi_parser import OpenAPIParser, prune_spec_to_get_operations
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Mapping
+
+# Diagnostics go to stderr only (stdout is JSON-RPC). One handler, no per-line flush syscalls.
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    _stderr_handler = logging.StreamHandler(sys.stderr)
+    _stderr_handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_stderr_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+async def _initialize_in_background() -> None:
+    """Warm up the registry at startup; tool calls wait on _init_lock and retry if this fails."""
+    try:
+        await initialize_server()
+    except Exception as e:
+        logger.info("⚠ Background initialization failed: %s", e)
 
-mcp = FastMCP("softwareone-marketplace")
+
+@asynccontextmanager
+async def _lifespan(server: FastMCP) -> AsyncIterator[dict[str, Any]]:
+    """Load the spec while the client handshakes, and close the API client's pooled connections on shutdown."""
+    init_task = asyncio.create_task(_initialize_in_background())
+    try:
+        yield {}
+    finally:
+        init_task.cancel()
+        if api_client is not None:
+            await api_client.aclose()
+
+
+mcp = FastMCP("softwareone-marketplace", lifespan=_lifespan)
 
 # FastMCP 3.0 exposes list_tools() and list_resources() natively; no compat layer needed.
 
 api_client: APIClient | None = None
-endpoints_registry: dict[str, dict[str, Any]] = {}
+# Read-only view, rebound as a whole on each (re)initialization
+endpoints_registry: Mapping[str, dict[str, Any]] = MappingProxyType({})
 openapi_spec: dict[str, Any] = {}
+# "#/components/<kind>/<name>" -> object, rebuilt with openapi_spec
+_components_index: dict[str, Any] = {}
 cache_manager: CacheManager | None = None
 _initialized: bool = False
-
-
-def _log_stderr(message: str) -> None:
-    """Print to stderr for tool diagnostics (RQL, params, count). Safe for STDIO (stdout is JSON-RPC only)."""
-    print(message, file=sys.stderr, flush=True)
+# Sorted resource IDs, computed once per (re)initialization
+_resource_ids: tuple[str, ...] = ()
+# marketplace_resources payload; depends only on the registry, so built once per (re)initialization
+_resources_response: dict[str, Any] | None = None
+# marketplace_resource_schema results per resource; replaced whenever the spec is reloaded
+_schema_cache: dict[str, dict[str, Any]] = {}
+# Serializes initialization so concurrent first tool calls fetch and parse the spec once
+_init_lock = asyncio.Lock()
 
 
 async def initialize_server(force_refresh: bool = False):
@@ -41,91 +89,119 @@ async def initialize_server(force_refresh: bool = False):
     Args:
         force_refresh: Force refresh cache even if valid cache exists
     """
-    global api_client, endpoints_registry, openapi_spec, cache_manager, _initialized
-
     if _initialized and not force_refresh:
         return
 
-    import sys
+    async with _init_lock:
+        # Re-check: another caller may have finished initializing while we waited
+        if _initialized and not force_refresh:
+            return
+        await _load_server_state(force_refresh)
 
-    def log(message):
-        print(message, file=sys.stderr, flush=True)
 
-    # STDIO is for local development - don't use analytics
-    log("📊 Analytics disabled (STDIO mode is for local development)")
+async def _load_server_state(force_refresh: bool) -> None:
+    """Create the API client and cache manager and build the endpoints registry (caller holds _init_lock)."""
+    global api_client, endpoints_registry, openapi_spec, cache_manager, _initialized, _resource_ids, _resources_response, _schema_cache, _components_index
 
-    errors = config.validate()
-    if errors:
-        log("❌ Configuration errors:")
-        for error in errors:
-            log(f"  - {error}")
-        raise ValueError("Invalid configuration")
+    log = logger.info
 
-    api_client = APIClient(base_url=config.marketplace_api_base_url, token=config.marketplace_api_token, timeout=config.request_timeout)
-
-    cache_manager = CacheManager(cache_dir=".cache", ttl_hours=24)
-
-    openapi_parser = OpenAPIParser()
-
-    try:
-        log(f"📡 Loading OpenAPI spec from: {config.openapi_spec_url}")
+    # Config is fixed for the process lifetime: validate and build the client once, not on every refresh
+    if api_client is None:
+        # STDIO is for local development - don't use analytics
+        log("📊 Analytics disabled (STDIO mode is for local development)")
 
-        spec = await fetch_with_cache(url=config.openapi_spec_url, cache_manager=cache_manager, force_refresh=force_refresh)
+        errors = config.validate()
+        if errors:
+            log("❌ Configuration errors:")
+            for error in errors:
+                log("  - %s", error)
+            raise ValueError("Invalid configuration")
 
-        tools = openapi_parser.extract_get_endpoints(spec)
+        api_client = APIClient(base_url=config.marketplace_api_base_url, token=config.marketplace_api_token, timeout=config.request_timeout)
 
-        openapi_spec = spec
+        cache_manager = CacheManager(cache_dir=".cache", ttl_hours=24)
 
-        for tool in tools:
-            tool_info = json.loads(tool.description)
-            path = tool_info.get("path", "")
-
-            resource_id = _path_to_resource_id(path)
-
-            endpoints_registry[resource_id] = {
-                "path": path,
-                "summary": tool_info.get("summary", ""),
-                "parameters": tool_info.get("parameters", []),
-            }
-
-        log(f"✓ Discovered {len(endpoints_registry)} GET endpoints")
-        log(f"✓ Stored in memory registry with {len(endpoints_registry)} resource IDs")
+    try:
+        log("📡 Loading OpenAPI spec from: %s", config.openapi_spec_url)
+
+        # Warm start: reuse the pruned spec and registry built from an unchanged cached spec
+        parsed = None if force_refresh else cache_manager.get_parsed(config.openapi_spec_url)
+        if parsed is not None:
+            log("✓ Using parsed OpenAPI spec cache")
+            get_spec, registry = parsed
+        else:
+            spec = await fetch_with_cache(url=config.openapi_spec_url, cache_manager=cache_manager, force_refresh=force_refresh)
+            # Only GET operations are ever served; don't keep the rest of the document alive after init
+            get_spec = prune_spec_to_get_operations(spec)
+            registry = None
+
+        # A refresh that brings back the same spec leaves everything derived from it valid
+        if _initialized and get_spec == openapi_spec:
+            log("✓ OpenAPI spec unchanged; keeping %d registered endpoints", len(endpoints_registry))
+            return
+
+        if registry is None:
+            registry = _build_registry(get_spec)
+            try:
+                cache_manager.set_parsed(config.openapi_spec_url, (get_spec, registry))
+            except Exception as cache_err:
+                log("⚠ Parsed spec cache not written: %s", cache_err)
+
+        openapi_spec = get_spec
+        _components_index = build_components_index(get_spec)
+        _schema_cache = {}
+
+        endpoints_registry = MappingProxyType(registry)
+        _resource_ids = tuple(sorted(registry))
+        _resources_response = (
+            execute_marketplace_resources(
+                api_base_url=config.marketplace_api_base_url,
+                user_id=None,  # STDIO is single-user
+                endpoints_registry=registry,
+            )
+            if registry
+            else None
+        )
+
+        log("✓ Discovered %d GET endpoints", len(endpoints_registry))
+        log("✓ Stored in memory registry with %d resource IDs", len(endpoints_registry))
 
         try:
-            from . import audit_fields
-
-            audit_fields.update_cache(config.marketplace_api_base_url, spec, _path_to_resource_id)
+            audit_fields.update_cache(config.marketplace_api_base_url, get_spec, _path_to_resource_id)
             log("✓ Audit fields cache updated")
         except Exception as audit_err:
-            log(f"⚠ Audit fields cache skipped: {audit_err}")
+            log("⚠ Audit fields cache skipped: %s", audit_err)
 
         _initialized = True
 
     except Exception as e:
-        log(f"⚠ Failed to load OpenAPI spec: {e}")
-        endpoints_registry = {}
+        log("⚠ Failed to load OpenAPI spec: %s", e)
+        endpoints_registry = MappingProxyType({})
+        _resource_ids = ()
+        _resources_response = None
         _initialized = False
 
 
-def _path_to_resource_id(path: str) -> str:
-    """
-    Convert an API path to a resource identifier
-
-    Examples:
-        /public/v1/catalog/products -> catalog.products
-        /public/v1/catalog/items/{id} -> catalog.items.by_id
-        /public/v1/commerce/orders -> commerce.orders
-    """
-    path = path.replace("/public/v1/", "")
-    path = path.replace("/{id}", ".by_id")
-    resource_id = path.replace("/", ".")
-
-    return resource_id
+def _build_registry(get_spec: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    """Build the endpoints registry from a GET-only spec."""
+    # Built into a fresh dict and rebound once by the caller, so a refresh never leaves endpoints
+    # removed from the spec behind and readers never see a half-built registry.
+    registry: dict[str, dict[str, Any]] = {}
+    for endpoint in OpenAPIParser().extract_endpoint_infos(get_spec):
+        enum_fields, path_params_info = extract_parameter_info(endpoint.parameters)
+        registry[_path_to_resource_id(endpoint.path)] = {
+            "path": endpoint.path,
+            "summary": endpoint.summary,
+            "parameters": endpoint.parameters,
+            "enum_fields": enum_fields,
+            "path_params_info": path_params_info,
+        }
+    return registry
 
 
 def _build_resource_enum() -> list[str]:
     """Build list of available resource IDs for the enum"""
-    return sorted(endpoints_registry.keys())
+    return list(_resource_ids)
 
 
 @mcp.tool()
@@ -186,8 +262,6 @@ async def marketplace_query(
     if not api_client:
         return {"error": "Server not initialized"}
 
-    from . import audit_fields
-
     _audit_regex = audit_fields.get_audit_regex(config.marketplace_api_base_url)
     return await execute_marketplace_query(
         resource=resource,
@@ -205,6 +279,7 @@ async def marketplace_query(
         config=config,
         audit_regex=_audit_regex,
         openapi_spec=openapi_spec,
+        components_index=_components_index,
     )
 
 
@@ -235,14 +310,10 @@ async def marketplace_resources() -> dict[str, Any]:
     if not _initialized:
         await initialize_server()
 
-    if not endpoints_registry:
+    if _resources_response is None:
         return {"error": "Server not initialized or no endpoints available"}
 
-    return execute_marketplace_resources(
-        api_base_url=config.marketplace_api_base_url,
-        user_id=None,  # STDIO is single-user
-        endpoints_registry=endpoints_registry,
-    )
+    return _resources_response
 
 
 @mcp.tool()
@@ -291,7 +362,7 @@ async def marketplace_refresh_cache() -> dict[str, Any]:
         return {"error": "Cache manager not initialized"}
 
     try:
-        print("🔄 Force refreshing OpenAPI spec cache...")
+        logger.info("🔄 Force refreshing OpenAPI spec cache...")
 
         cache_manager.invalidate(config.openapi_spec_url)
 
@@ -347,11 +418,22 @@ async def marketplace_resource_schema(resource: str) -> dict[str, Any]:
     if not openapi_spec:
         return {"error": "OpenAPI spec not loaded", "hint": "Server initialization may have failed"}
 
-    return execute_marketplace_resource_schema(
+    cached = _schema_cache.get(resource)
+    if cached is not None:
+        return cached
+
+    # Cache miss: walk the schema in a worker thread so the event loop keeps serving other calls
+    result = await asyncio.to_thread(
+        execute_marketplace_resource_schema,
         resource=resource,
         openapi_spec=openapi_spec,
         endpoints_registry=endpoints_registry,
+        components_index=_components_index,
     )
+    # Only known resources are cached, so arbitrary unknown names cannot grow the cache
+    if resource in endpoints_registry:
+        _schema_cache[resource] = result
+    return result
 
 
 @mcp.tool()
@@ -374,34 +456,38 @@ async def marketplace_audit_fields(resource: str | None = None) -> dict[str, Any
     """
     if not _initialized:
         await initialize_server()
-    from . import audit_fields
-
     return audit_fields.get_audit_fields(config.marketplace_api_base_url, resource)
 
 
 if __name__ == "__main__":
-    import sys
-
     # Send all logs to stderr (stdout is for JSON-RPC only!)
-    def log(message):
-        print(message, file=sys.stderr, flush=True)
+    log = logger.info
 
     try:
         log("=" * 60)
         log("🚀 SoftwareOne Marketplace MCP Server (Stdio Mode)")
         log("=" * 60)
-        log("\nServer will initialize on first tool call...")
+        log("\nServer initializes in the background while the client connects...")
         log("Available tools: 7 (streamlined interface with caching)")
         log("\n✓ Starting server on stdio...")
         log("=" * 60 + "\n")
 
-        mcp.run()
+        import importlib.util
+
+        if importlib.util.find_spec("uvloop") is not None:
+            # Optional speedup: uvloop cuts per-message dispatch overhead when it is installed
+            import anyio
+
+            log("⚡ Using uvloop event loop")
+            anyio.run(mcp.run_async, backend_options={"use_uvloop": True})
+        else:
+            mcp.run()
 
     except KeyboardInterrupt:
         log("\n\nShutting down server...")
         sys.exit(0)
     except Exception as e:
-        log(f"\n❌ Error: {e}")
+        log("\n❌ Error: %s", e)
         import traceback
 
         traceback.print_exc(file=sys.stderr)
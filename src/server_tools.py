@@ -1,5 +1,8 @@
+from __future__ import annotations
+
+import asyncio
 import time
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from . import (
     audit_fields as audit_fields_module,
@@ -17,15 +20,103 @@ from .mcp_tools import (
 )
 from .server_context import _current_user_id, get_client_api_client_http, log
 
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from .api_client import APIClient
+
 DOCUMENTATION_CACHE_UNAVAILABLE_MSG = "Documentation cache is not available. Please configure GITBOOK_API_KEY and GITBOOK_SPACE_ID."
 AUTH_HINT_HEADER_TOKEN = "Provide X-MPT-Authorization header with your API token"
 OPENAPI_SPEC_LOAD_ERROR = "Failed to load OpenAPI spec"
+DOCS_LIST_DEFAULT_LIMIT = 100
+
+# Unfiltered marketplace_docs_list payload as (docs cache, its last_refresh, result); rebuilt after each refresh
+_default_docs_list: tuple[Any, Any, dict[str, Any]] | None = None
+
+# User-independent marketplace_resources payload per API base URL as (registry, result); rebuilt when the registry is replaced
+_resources_responses: dict[str, tuple[dict[str, Any], dict[str, Any]]] = {}
+
+
+class _ToolContextError(Exception):
+    """Raised while preparing a tool call; carries the error payload the tool returns as-is."""
+
+    def __init__(self, response: dict[str, Any]):
+        super().__init__(response.get("error"))
+        self.response = response
+
+
+def _spec_load_error(api_base_url: str, error: Exception) -> dict[str, Any]:
+    return {"error": OPENAPI_SPEC_LOAD_ERROR, "details": str(error)}
+
+
+async def _load_tool_context(
+    *, with_spec: bool = False, load_error: Callable[[str, Exception], dict[str, Any]] = _spec_load_error
+) -> tuple[APIClient, dict[str, Any], dict[str, Any] | None]:
+    """Resolve the caller's API client and its endpoint registry (plus the OpenAPI spec when with_spec is set)."""
+    try:
+        api_client = await get_client_api_client_http()
+    except ValueError as e:
+        raise _ToolContextError({"error": str(e), "hint": AUTH_HINT_HEADER_TOKEN}) from e
+    api_base_url = api_client.base_url
+    try:
+        endpoints_registry_data = await endpoint_registry.get_endpoints_registry(api_base_url)
+        openapi_spec = await endpoint_registry.get_openapi_spec(api_base_url) if with_spec else None
+    except Exception as e:
+        raise _ToolContextError(load_error(api_base_url, e)) from e
+    return api_client, endpoints_registry_data, openapi_spec
+
+
+def _query_spec_load_error(api_base_url: str, error: Exception) -> dict[str, Any]:
+    return {
+        "error": f"{OPENAPI_SPEC_LOAD_ERROR} for your endpoint",
+        "api_endpoint": api_base_url,
+        "details": str(error),
+        "hint": f"Ensure {api_base_url}/public/v1/openapi.json is accessible",
+    }
+
+
+def _audit_spec_load_error(api_base_url: str, error: Exception) -> dict[str, Any]:
+    return {"error": f"{OPENAPI_SPEC_LOAD_ERROR} for audit fields", "details": str(error), "api_endpoint": api_base_url}
+
+
+def _build_docs_list_result(resources: list[dict[str, Any]], section: str | None, subsection: str | None, search: str | None, limit: int) -> dict[str, Any]:
+    """Build the marketplace_docs_list response for resources returned by the documentation cache."""
+    # DocumentationCache already stores browser_url top-level; only copy resources that still need it merged
+    resources_for_response = [{**r, "browser_url": r["metadata"]["browser_url"]} if "browser_url" not in r and r.get("metadata", {}).get("browser_url") else r for r in resources]
+    result = {
+        "total": len(resources_for_response),
+        "resources": resources_for_response,
+        "filters_applied": {name: value for name, value in (("section", section), ("subsection", subsection), ("search", search)) if value},
+        "usage": (
+            "Use marketplace_docs_read(uri='docs://path') to read a page. "
+            "Prefer showing users the browser_url (public link) when present; "
+            "do not show internal uri or id to end users."
+        ),
+    }
+    if len(resources) >= limit:
+        result["tip"] = f"Showing first {limit} results. Use 'section' or 'search' parameters to narrow down."
+    elif len(resources) > 50:
+        result["tip"] = "Consider using 'section' or 'subsection' filters to narrow down results."
+    return result
+
 
+async def _get_default_docs_list(dc) -> dict[str, Any]:
+    """Return the unfiltered listing, built once per documentation refresh (treat as read-only)."""
+    global _default_docs_list
+    await dc.ensure_cached()
+    cached = _default_docs_list
+    if cached is not None and cached[0] is dc and cached[1] == dc.last_refresh:
+        return cached[2]
+    resources = await dc.list_resources(limit=DOCS_LIST_DEFAULT_LIMIT)
+    result = _build_docs_list_result(resources, None, None, None, DOCS_LIST_DEFAULT_LIMIT)
+    _default_docs_list = (dc, dc.last_refresh, result)
+    return result
 
-async def marketplace_docs_list(section: str = None, subsection: str = None, search: str = None, limit: int = 100) -> dict[str, Any]:
+
+async def marketplace_docs_list(section: str = None, subsection: str = None, search: str = None, limit: int = DOCS_LIST_DEFAULT_LIMIT) -> dict[str, Any]:
     """List documentation resources with optional filters (section, subsection, search)."""
     analytics = get_analytics_logger()
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
     try:
         await server_docs.initialize_documentation_cache()
         dc = server_docs.documentation_cache
@@ -38,43 +129,20 @@ async def marketplace_docs_list(section: str = None, subsection: str = None, sea
             if analytics and config.analytics_enabled:
                 await analytics.log_tool_call(
                     tool_name="marketplace_docs_list",
-                    response_time_ms=int((time.time() - start_time) * 1000),
+                    response_time_ms=(time.perf_counter_ns() - start_ns) // 1_000_000,
                     success=False,
                     error_message="Not initialized",
                 )
             return result
-        resources = await dc.list_resources(section=section, subsection=subsection, search=search, limit=limit)
-        resources_for_response = []
-        for r in resources:
-            item = dict(r)
-            if r.get("metadata", {}).get("browser_url"):
-                item["browser_url"] = r["metadata"]["browser_url"]
-            resources_for_response.append(item)
-        filters = []
-        if section:
-            filters.append(f"section={section}")
-        if subsection:
-            filters.append(f"subsection={subsection}")
-        if search:
-            filters.append(f"search='{search}'")
-        result = {
-            "total": len(resources_for_response),
-            "resources": resources_for_response,
-            "filters_applied": ", ".join(filters) if filters else "none",
-            "usage": (
-                "Use marketplace_docs_read(uri='docs://path') to read a page. "
-                "Prefer showing users the browser_url (public link) when present; "
-                "do not show internal uri or id to end users."
-            ),
-        }
-        if len(resources) >= limit:
-            result["tip"] = f"Showing first {limit} results. Use 'section' or 'search' parameters to narrow down."
-        elif len(resources) > 50:
-            result["tip"] = "Consider using 'section' or 'subsection' filters to narrow down results."
+        if section is None and subsection is None and search is None and limit == DOCS_LIST_DEFAULT_LIMIT:
+            result = await _get_default_docs_list(dc)
+        else:
+            resources = await dc.list_resources(section=section, subsection=subsection, search=search, limit=limit)
+            result = _build_docs_list_result(resources, section, subsection, search, limit)
         if analytics and config.analytics_enabled:
             await analytics.log_tool_call(
                 tool_name="marketplace_docs_list",
-                response_time_ms=int((time.time() - start_time) * 1000),
+                response_time_ms=(time.perf_counter_ns() - start_ns) // 1_000_000,
                 success=True,
                 result_count=result.get("total", 0),
             )
@@ -83,7 +151,7 @@ async def marketplace_docs_list(section: str = None, subsection: str = None, sea
         if analytics and config.analytics_enabled:
             await analytics.log_tool_call(
                 tool_name="marketplace_docs_list",
-                response_time_ms=int((time.time() - start_time) * 1000),
+                response_time_ms=(time.perf_counter_ns() - start_ns) // 1_000_000,
                 success=False,
                 error_message=str(e),
             )
@@ -103,21 +171,11 @@ def register_http_tools(mcp):
         path_params: dict[str, str] | None = None,
     ) -> dict[str, Any]:
         try:
-            api_client = await get_client_api_client_http()
-        except ValueError as e:
-            return {"error": str(e), "hint": AUTH_HINT_HEADER_TOKEN}
+            api_client, endpoints_registry_data, openapi_spec = await _load_tool_context(with_spec=True, load_error=_query_spec_load_error)
+        except _ToolContextError as e:
+            return e.response
         api_base_url = api_client.base_url
         log(f"🔍 Using API endpoint: {api_base_url}")
-        try:
-            endpoints_registry_data = await endpoint_registry.get_endpoints_registry(api_base_url)
-            openapi_spec = await endpoint_registry.get_openapi_spec(api_base_url)
-        except Exception as e:
-            return {
-                "error": f"{OPENAPI_SPEC_LOAD_ERROR} for your endpoint",
-                "api_endpoint": api_base_url,
-                "details": str(e),
-                "hint": f"Ensure {api_base_url}/public/v1/openapi.json is accessible",
-            }
         audit_regex = audit_fields_module.get_audit_regex(api_base_url)
         return await execute_marketplace_query(
             resource=resource,
@@ -135,6 +193,7 @@ def register_http_tools(mcp):
             config=config,
             audit_regex=audit_regex,
             openapi_spec=openapi_spec,
+            components_index=endpoint_registry.get_components_index(api_base_url),
         )
 
     @mcp.tool()
@@ -144,32 +203,22 @@ def register_http_tools(mcp):
     @mcp.tool()
     async def marketplace_resources() -> dict[str, Any]:
         try:
-            api_client = await get_client_api_client_http()
-        except ValueError as e:
-            return {"error": str(e), "hint": AUTH_HINT_HEADER_TOKEN}
+            api_client, endpoints_registry_data, _ = await _load_tool_context()
+        except _ToolContextError as e:
+            return e.response
         api_base_url = api_client.base_url
-        try:
-            endpoints_registry_data = await endpoint_registry.get_endpoints_registry(api_base_url)
-        except Exception as e:
-            return {"error": OPENAPI_SPEC_LOAD_ERROR, "details": str(e)}
-        user_id = _current_user_id.get()
-        return execute_marketplace_resources(
-            api_base_url=api_base_url,
-            user_id=user_id,
-            endpoints_registry=endpoints_registry_data,
-        )
+        cached = _resources_responses.get(api_base_url)
+        if cached is None or cached[0] is not endpoints_registry_data:
+            result = execute_marketplace_resources(api_base_url=api_base_url, user_id=None, endpoints_registry=endpoints_registry_data)
+            cached = _resources_responses[api_base_url] = (endpoints_registry_data, result)
+        return {**cached[1], "user": _current_user_id.get() or "unknown"}
 
     @mcp.tool()
     async def marketplace_resource_info(resource: str) -> dict[str, Any]:
         try:
-            api_client = await get_client_api_client_http()
-        except ValueError as e:
-            return {"error": str(e), "hint": AUTH_HINT_HEADER_TOKEN}
-        api_base_url = api_client.base_url
-        try:
-            endpoints_registry_data = await endpoint_registry.get_endpoints_registry(api_base_url)
-        except Exception as e:
-            return {"error": OPENAPI_SPEC_LOAD_ERROR, "details": str(e)}
+            _, endpoints_registry_data, _ = await _load_tool_context()
+        except _ToolContextError as e:
+            return e.response
         return execute_marketplace_resource_info(
             resource=resource,
             endpoints_registry=endpoints_registry_data,
@@ -178,38 +227,38 @@ def register_http_tools(mcp):
     @mcp.tool()
     async def marketplace_resource_schema(resource: str) -> dict[str, Any]:
         try:
-            api_client = await get_client_api_client_http()
-        except ValueError as e:
-            return {"error": str(e), "hint": AUTH_HINT_HEADER_TOKEN}
+            api_client, endpoints_registry_data, spec = await _load_tool_context(with_spec=True)
+        except _ToolContextError as e:
+            return e.response
         api_base_url = api_client.base_url
-        try:
-            spec = await endpoint_registry.get_openapi_spec(api_base_url)
-            endpoints_registry_data = await endpoint_registry.get_endpoints_registry(api_base_url)
-        except Exception as e:
-            return {"error": OPENAPI_SPEC_LOAD_ERROR, "details": str(e)}
-        return execute_marketplace_resource_schema(
+        schema_cache = endpoint_registry.get_schema_cache(api_base_url)
+        cached = schema_cache.get(resource)
+        if cached is not None:
+            return cached
+        # Cache miss: walk the schema in a worker thread so the event loop keeps serving other calls
+        result = await asyncio.to_thread(
+            execute_marketplace_resource_schema,
             resource=resource,
             openapi_spec=spec,
             endpoints_registry=endpoints_registry_data,
+            components_index=endpoint_registry.get_components_index(api_base_url),
         )
+        if resource in endpoints_registry_data:
+            schema_cache[resource] = result
+        return result
 
     @mcp.tool()
     async def marketplace_audit_fields(resource: str | None = None) -> dict[str, Any]:
         try:
-            api_client = await get_client_api_client_http()
-        except ValueError as e:
-            return {"error": str(e), "hint": AUTH_HINT_HEADER_TOKEN}
-        api_base_url = api_client.base_url
-        try:
-            await endpoint_registry.get_endpoints_registry(api_base_url)
-        except Exception as e:
-            return {"error": f"{OPENAPI_SPEC_LOAD_ERROR} for audit fields", "details": str(e), "api_endpoint": api_base_url}
-        return audit_fields_module.get_audit_fields(api_base_url, resource)
+            api_client, _, _ = await _load_tool_context(load_error=_audit_spec_load_error)
+        except _ToolContextError as e:
+            return e.response
+        return audit_fields_module.get_audit_fields(api_client.base_url, resource)
 
     @mcp.tool()
     async def marketplace_docs_index() -> dict[str, Any]:
         analytics = get_analytics_logger()
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         try:
             await server_docs.initialize_documentation_cache()
             dc = server_docs.documentation_cache
@@ -221,18 +270,20 @@ def register_http_tools(mcp):
                 }
                 if analytics and config.analytics_enabled:
                     await analytics.log_tool_call(
-                        tool_name="marketplace_docs_index", response_time_ms=int((time.time() - start_time) * 1000), success=False, error_message="Not initialized"
+                        tool_name="marketplace_docs_index", response_time_ms=(time.perf_counter_ns() - start_ns) // 1_000_000, success=False, error_message="Not initialized"
                     )
                 return result
             result = await dc.get_documentation_index()
             if analytics and config.analytics_enabled:
                 await analytics.log_tool_call(
-                    tool_name="marketplace_docs_index", response_time_ms=int((time.time() - start_time) * 1000), success=True, result_count=result.get("total_pages", 0)
+                    tool_name="marketplace_docs_index", response_time_ms=(time.perf_counter_ns() - start_ns) // 1_000_000, success=True, result_count=result.get("total_pages", 0)
                 )
             return result
         except Exception as e:
             if analytics and config.analytics_enabled:
-                await analytics.log_tool_call(tool_name="marketplace_docs_index", response_time_ms=int((time.time() - start_time) * 1000), success=False, error_message=str(e))
+                await analytics.log_tool_call(
+                    tool_name="marketplace_docs_index", response_time_ms=(time.perf_counter_ns() - start_ns) // 1_000_000, success=False, error_message=str(e)
+                )
             raise
 
     mcp.tool()(marketplace_docs_list)
@@ -243,7 +294,7 @@ def register_http_tools(mcp):
         Returns a JSON object: {"text": "<markdown content>", "count": 1}.
         Clients should use the "text" field for the document body and "count" (always 1) for consistency with other tools."""
         analytics = get_analytics_logger()
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         try:
             await server_docs.initialize_documentation_cache()
             dc = server_docs.documentation_cache
@@ -251,7 +302,7 @@ def register_http_tools(mcp):
                 result = {"text": DOCUMENTATION_CACHE_UNAVAILABLE_MSG, "count": 0}
                 if analytics and config.analytics_enabled:
                     await analytics.log_resource_read(
-                        resource_uri=uri, success=False, response_time_ms=int((time.time() - start_time) * 1000), error_message="Documentation cache not available"
+                        resource_uri=uri, success=False, response_time_ms=(time.perf_counter_ns() - start_ns) // 1_000_000, error_message="Documentation cache not available"
                     )
                 return result
             content = await dc.get_resource(uri)
@@ -259,21 +310,21 @@ def register_http_tools(mcp):
                 result = {"text": f"Documentation page not found: {uri}\n\nUse marketplace_docs_list() to see available pages.", "count": 0}
                 if analytics and config.analytics_enabled:
                     await analytics.log_resource_read(
-                        resource_uri=uri, success=False, response_time_ms=int((time.time() - start_time) * 1000), error_message="Documentation page not found"
+                        resource_uri=uri, success=False, response_time_ms=(time.perf_counter_ns() - start_ns) // 1_000_000, error_message="Documentation page not found"
                     )
                 return result
             if analytics and config.analytics_enabled:
-                await analytics.log_resource_read(resource_uri=uri, success=True, response_time_ms=int((time.time() - start_time) * 1000), cache_hit=True)
+                await analytics.log_resource_read(resource_uri=uri, success=True, response_time_ms=(time.perf_counter_ns() - start_ns) // 1_000_000, cache_hit=True)
             return {"text": content, "count": 1}
         except Exception as e:
             if analytics and config.analytics_enabled:
-                await analytics.log_resource_read(resource_uri=uri, success=False, response_time_ms=int((time.time() - start_time) * 1000), error_message=str(e))
+                await analytics.log_resource_read(resource_uri=uri, success=False, response_time_ms=(time.perf_counter_ns() - start_ns) // 1_000_000, error_message=str(e))
             raise
 
     @mcp.tool()
     async def marketplace_resources_info() -> dict[str, Any]:
         analytics = get_analytics_logger()
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         try:
             result = {
                 "documentation": {"enabled": False, "total_pages": 0, "cache_info": None},
@@ -299,9 +350,11 @@ def register_http_tools(mcp):
             except Exception as e_inner:
                 result["token_validation"] = {"enabled": False, "error": str(e_inner)}
             if analytics and config.analytics_enabled:
-                await analytics.log_tool_call(tool_name="marketplace_resources_info", response_time_ms=int((time.time() - start_time) * 1000), success=True)
+                await analytics.log_tool_call(tool_name="marketplace_resources_info", response_time_ms=(time.perf_counter_ns() - start_ns) // 1_000_000, success=True)
             return result
         except Exception as e:
             if analytics and config.analytics_enabled:
-                await analytics.log_tool_call(tool_name="marketplace_resources_info", response_time_ms=int((time.time() - start_time) * 1000), success=False, error_message=str(e))
+                await analytics.log_tool_call(
+                    tool_name="marketplace_resources_info", response_time_ms=(time.perf_counter_ns() - start_ns) // 1_000_000, success=False, error_message=str(e)
+                )
             raise
@@ -1,25 +1,63 @@
+from __future__ import annotations
+
 import asyncio
 import base64
 import hashlib
-import json
 import logging
+import random
+import re
+import secrets
 import time
-from datetime import datetime, timedelta
+import weakref
+from collections import OrderedDict
+from datetime import timedelta
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, NamedTuple
 
 import httpx
+import pydantic_core
 from jose import jwt as jose_jwt
 from jose.exceptions import ExpiredSignatureError
 from jose.jwt import JWTError
 
 from .config import config
 
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+# Prefix of Marketplace API tokens: idt:TKN-XXXX-XXXX:secret
+API_TOKEN_PREFIX = "idt:"
+
+# TKN-... ID in the second colon-separated field of an API token
+_API_TOKEN_ID_RE = re.compile(r"[^:]*:(TKN-[^:]*)")
+
 # Algorithms we accept for JWT signature verification (never trust token's alg header alone)
 JWT_ALGORITHMS = ["RS256", "RS384", "RS512", "ES256", "ES384", "ES512"]
 
+# jose decode options: exp is checked afterwards with leeway (see _check_jwt_exp)
+_JWT_DECODE_OPTIONS = {
+    "verify_signature": True,
+    "verify_aud": False,
+    "verify_exp": False,
+    "verify_iat": True,
+    "verify_nbf": True,
+    "verify_iss": False,
+    "require_exp": False,
+}
+
 logger = logging.getLogger(__name__)
 
+# Time-to-live for cached invalid results (401/404, inactive tokens)
+TOKEN_CACHE_NEGATIVE_TTL_SECONDS = 30.0
+
+# Minimum interval between sweeps of expired token cache entries
+TOKEN_CACHE_SWEEP_INTERVAL_SECONDS = 60.0
+
+# Per-process key for cache-key digests; the cache is in-memory, so keys never need to outlive the process
+_HASH_KEY = secrets.token_bytes(32)
 
-def _hash_token(token: str, api_base_url: str) -> str:
+
+def _hash_token(token: str, api_base_url: str) -> bytes:
     """
     Create a secure hash of token + endpoint for cache key.
 
@@ -30,10 +68,20 @@ def _hash_token(token: str, api_base_url: str) -> str:
         api_base_url: The API endpoint
 
     Returns:
-        SHA256 hash as hex string
+        16-byte keyed BLAKE2b digest
     """
-    combined = f"{token}|{api_base_url}"
-    return hashlib.sha256(combined.encode()).hexdigest()
+    digest = hashlib.blake2b(token.encode(), digest_size=16, key=_HASH_KEY)
+    digest.update(b"|")
+    digest.update(api_base_url.encode())
+    return digest.digest()
+
+
+class _CacheEntry(NamedTuple):
+    """A cached validation result; expiry is a time.monotonic() deadline"""
+
+    is_valid: bool
+    expiry: float
+    token_info: dict | None
 
 
 class TokenValidationCache:
@@ -43,22 +91,43 @@ class TokenValidationCache:
     Caches token validation results to avoid repeated API calls.
     Cache entries expire after a configurable TTL.
 
-    SECURITY: Uses SHA256 hash of token+endpoint as cache key instead of
+    SECURITY: Uses a keyed BLAKE2b digest of token+endpoint as cache key instead of
     storing full tokens in memory. This prevents token exposure if memory is dumped.
     """
 
-    def __init__(self, ttl_minutes: int = 10):
+    def __init__(
+        self,
+        ttl_minutes: int = 10,
+        max_entries: int = 10_000,
+        negative_ttl_seconds: float = TOKEN_CACHE_NEGATIVE_TTL_SECONDS,
+        max_negative_entries: int = 4096,
+    ):
         """
         Initialize token validation cache
 
         Args:
             ttl_minutes: Time-to-live for cache entries in minutes (default: 10)
+            max_entries: Maximum number of cached valid results; the least recently used are evicted beyond it (default: 10000)
+            negative_ttl_seconds: Time-to-live for invalid results in seconds, jittered by ±20% (default: 30)
+            max_negative_entries: Maximum number of cached invalid results, bounded separately (default: 4096)
         """
         self.ttl = timedelta(minutes=ttl_minutes)
-        # SECURITY: Keys are SHA256 hashes of token+endpoint, not raw tokens
-        self._cache: dict[str, tuple[bool, datetime, dict | None]] = {}
-        self._lock = asyncio.Lock()
-        logger.info(f"🔐 Token validation cache initialized (TTL: {ttl_minutes}m, secure hash keys)")
+        self._ttl_seconds = self.ttl.total_seconds()
+        # Short, so a rotated or newly provisioned token is accepted soon; jittered so retries don't line up
+        self._negative_ttl_seconds = negative_ttl_seconds
+        self._max_entries = max_entries
+        self._max_negative_entries = max_negative_entries
+        # Expired entries that are never looked up again are swept on set() at most once per interval
+        self._next_sweep = time.monotonic() + TOKEN_CACHE_SWEEP_INTERVAL_SECONDS
+        # SECURITY: Keys are keyed BLAKE2b digests of token+endpoint, not raw tokens
+        # Kept in least-recently-used order for eviction; each operation runs without awaiting,
+        # so it is atomic on the event loop and needs no lock
+        self._cache: OrderedDict[bytes, _CacheEntry] = OrderedDict()
+        # Invalid results live apart, so a burst of bad tokens cannot evict the valid ones
+        self._negative_cache: OrderedDict[bytes, _CacheEntry] = OrderedDict()
+        # Validations currently running upstream, by cache key (see validate_once)
+        self._inflight: dict[bytes, asyncio.Future[tuple[bool, dict | None, str | None]]] = {}
+        logger.info("🔐 Token validation cache initialized (TTL: %sm, secure hash keys)", ttl_minutes)
 
     async def get(self, token: str, api_base_url: str) -> tuple[bool, dict | None] | None:
         """
@@ -71,20 +140,53 @@ class TokenValidationCache:
         Returns:
             Tuple of (is_valid, token_info) if cached and not expired, None otherwise
         """
-        cache_key = _hash_token(token, api_base_url)
+        return self.get_by_key(_hash_token(token, api_base_url))
+
+    def get_by_key(self, cache_key: bytes) -> tuple[bool, dict | None] | None:
+        """
+        get() for a key already derived with _hash_token, so callers that also need the key hash the token once
 
-        async with self._lock:
-            if cache_key in self._cache:
-                is_valid, expiry, token_info = self._cache[cache_key]
+        Args:
+            cache_key: Digest of the token and API endpoint
 
-                if datetime.now() < expiry:
-                    logger.debug(f"✅ Token validation cache hit (expires in {(expiry - datetime.now()).seconds}s)")
-                    return (is_valid, token_info)
-                else:
-                    logger.debug("⏰ Token validation cache expired, removing")
-                    del self._cache[cache_key]
+        Returns:
+            Tuple of (is_valid, token_info) if cached and not expired, None otherwise
+        """
+        entries = self._cache
+        entry = entries.get(cache_key)
+        if entry is None:
+            entries = self._negative_cache
+            entry = entries.get(cache_key)
+        if entry is not None:
+            now = time.monotonic()
+            if now < entry.expiry:
+                entries.move_to_end(cache_key)
+                logger.debug("✅ Token validation cache hit (expires in %ds)", entry.expiry - now)
+                return (entry.is_valid, entry.token_info)
+            else:
+                logger.debug("⏰ Token validation cache expired, removing")
+                entries.pop(cache_key, None)
 
-            return None
+        return None
+
+    async def validate_once(self, cache_key: bytes, validate: Callable[[], Awaitable[tuple[bool, dict | None, str | None]]]) -> tuple[bool, dict | None, str | None]:
+        """
+        Run validate() for a cache key, sharing one run between concurrent callers (single flight)
+
+        Args:
+            cache_key: Digest of the token and API endpoint, as passed to get_by_key
+            validate: Starts the upstream validation; only called when none is running for the key
+
+        Returns:
+            Tuple of (is_valid, token_info, error_message) from the shared validation
+        """
+        inflight = self._inflight.get(cache_key)
+        if inflight is None:
+            inflight = asyncio.ensure_future(validate())
+            self._inflight[cache_key] = inflight
+            inflight.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+        # Shielded so one cancelled caller doesn't cancel the validation the others are waiting on
+        return await asyncio.shield(inflight)
 
     async def set(self, token: str, api_base_url: str, is_valid: bool, token_info: dict | None = None):
         """
@@ -97,11 +199,34 @@ class TokenValidationCache:
             token_info: Optional token metadata from API response
         """
         cache_key = _hash_token(token, api_base_url)
-
-        async with self._lock:
-            expiry = datetime.now() + self.ttl
-            self._cache[cache_key] = (is_valid, expiry, token_info)
-            logger.debug(f"💾 Cached token validation (valid={is_valid}, expires in {self.ttl.seconds}s)")
+        now = time.monotonic()
+        if now >= self._next_sweep:
+            self._sweep_expired(now)
+
+        if is_valid:
+            ttl_seconds = self._ttl_seconds
+            entries, stale, max_entries = self._cache, self._negative_cache, self._max_entries
+        else:
+            ttl_seconds = self._negative_ttl_seconds * random.uniform(0.8, 1.2)
+            entries, stale, max_entries = self._negative_cache, self._cache, self._max_negative_entries
+        stale.pop(cache_key, None)
+        entries[cache_key] = _CacheEntry(is_valid, now + ttl_seconds, token_info)
+        entries.move_to_end(cache_key)
+        if len(entries) > max_entries:
+            entries.popitem(last=False)
+        logger.debug("💾 Cached token validation (valid=%s, expires in %ds)", is_valid, ttl_seconds)
+
+    def _sweep_expired(self, now: float):
+        """Drop every expired entry and schedule the next sweep"""
+        swept = 0
+        for entries in (self._cache, self._negative_cache):
+            expired = [key for key, entry in entries.items() if entry.expiry <= now]
+            for key in expired:
+                del entries[key]
+            swept += len(expired)
+        self._next_sweep = now + TOKEN_CACHE_SWEEP_INTERVAL_SECONDS
+        if swept:
+            logger.debug("🧹 Swept %d expired token validations", swept)
 
     async def invalidate(self, token: str, api_base_url: str):
         """
@@ -113,28 +238,29 @@ class TokenValidationCache:
         """
         cache_key = _hash_token(token, api_base_url)
 
-        async with self._lock:
-            if cache_key in self._cache:
-                del self._cache[cache_key]
-                logger.debug("🗑️  Invalidated token from cache")
+        if self._cache.pop(cache_key, None) is not None or self._negative_cache.pop(cache_key, None) is not None:
+            logger.debug("🗑️  Invalidated token from cache")
 
     async def clear(self):
         """Clear all cached validations"""
-        async with self._lock:
-            self._cache.clear()
-            logger.info("🗑️  Cleared all token validation cache")
+        self._cache.clear()
+        self._negative_cache.clear()
+        logger.info("🗑️  Cleared all token validation cache")
 
     def get_stats(self) -> dict:
         """Get cache statistics"""
-        now = datetime.now()
-        valid_count = sum(1 for _, expiry, _ in self._cache.values() if expiry > now)
-        expired_count = len(self._cache) - valid_count
+        now = time.monotonic()
+        total_count = len(self._cache) + len(self._negative_cache)
+        valid_count = sum(1 for entries in (self._cache, self._negative_cache) for entry in entries.values() if entry.expiry > now)
+        expired_count = total_count - valid_count
 
         return {
-            "total_entries": len(self._cache),
+            "total_entries": total_count,
             "valid_entries": valid_count,
             "expired_entries": expired_count,
+            "negative_entries": len(self._negative_cache),
             "ttl_minutes": self.ttl.total_seconds() / 60,
+            "negative_ttl_seconds": self._negative_ttl_seconds,
         }
 
 
@@ -152,54 +278,123 @@ def get_token_cache(ttl_minutes: int = 10) -> TokenValidationCache:
     return _token_cache
 
 
-# JWKS cache for JWT signature verification (url -> (jwks_dict, expiry))
-_jwks_cache: dict[str, tuple[dict, datetime]] = {}
-_jwks_cache_ttl = timedelta(minutes=60)
-_jwks_lock = asyncio.Lock()
+# Shared HTTP client (one per event loop) for validation and JWKS requests, so repeated misses reuse warm connections
+_HTTP_TIMEOUT = httpx.Timeout(30.0, connect=30.0)
+_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64)
+_http_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = weakref.WeakKeyDictionary()
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client for the running event loop, creating it on first use"""
+    loop = asyncio.get_running_loop()
+    client = _http_clients.get(loop)
+    if client is None:
+        client = _http_clients[loop] = httpx.AsyncClient(follow_redirects=True, http2=True, timeout=_HTTP_TIMEOUT, limits=_HTTP_LIMITS)
+    return client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client of the running event loop, if one was opened"""
+    client = _http_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+# JWKS cache for JWT signature verification (url -> (jwks_dict, time.monotonic() expiry))
+_jwks_cache: dict[str, tuple[dict, float]] = {}
+_jwks_cache_ttl_seconds = 60 * 60.0
+# Within this window before expiry a cached JWKS is still served while one background fetch refreshes it
+_jwks_refresh_ahead_seconds = 5 * 60.0
+# After a failed fetch, background refreshes of that URL wait until this monotonic deadline (url -> deadline)
+_jwks_refresh_retry_at: dict[str, float] = {}
+_jwks_refresh_retry_seconds = 30.0
+# JWKS fetches currently in flight, by URL, shared by concurrent cache misses
+_jwks_inflight: dict[str, asyncio.Future[dict | None]] = {}
 
 
 async def _fetch_jwks_cached(jwks_url: str) -> dict | None:
     """
     Fetch JWKS from URL with in-memory cache (TTL 1 hour).
 
+    Concurrent misses for the same URL share a single fetch. Shortly before expiry the cached
+    JWKS is refreshed in the background, so requests don't all wait on the fetch at the TTL boundary.
+
     Returns:
         JWKS dict with "keys" list, or None on fetch/parse error.
     """
-    async with _jwks_lock:
-        if jwks_url in _jwks_cache:
-            jwks_dict, expiry = _jwks_cache[jwks_url]
-            if datetime.now() < expiry:
-                return jwks_dict
-            del _jwks_cache[jwks_url]
-
+    cached = _jwks_cache.get(jwks_url)
+    if cached is not None:
+        jwks_dict, expiry = cached
+        now = time.monotonic()
+        remaining = expiry - now
+        if remaining > 0:
+            # A failed refresh leaves the current entry in place until it expires, and is retried
+            # after a back-off rather than on every request
+            if remaining <= _jwks_refresh_ahead_seconds and now >= _jwks_refresh_retry_at.get(jwks_url, 0.0):
+                _start_jwks_fetch(jwks_url)
+            return jwks_dict
+        _jwks_cache.pop(jwks_url, None)
+
+    return await asyncio.shield(_start_jwks_fetch(jwks_url))
+
+
+def _start_jwks_fetch(jwks_url: str) -> asyncio.Future[dict | None]:
+    """Return the fetch in flight for a JWKS URL, starting one if there is none."""
+    inflight = _jwks_inflight.get(jwks_url)
+    if inflight is None:
+        inflight = asyncio.ensure_future(_fetch_jwks(jwks_url))
+        _jwks_inflight[jwks_url] = inflight
+        inflight.add_done_callback(lambda _: _jwks_inflight.pop(jwks_url, None))
+    return inflight
+
+
+async def _fetch_jwks(jwks_url: str) -> dict | None:
+    """Fetch and validate a JWKS document, caching it on success; see _fetch_jwks_cached."""
     try:
-        # 30s connect and default for JWKS fetch
-        timeout_config = httpx.Timeout(30.0, connect=30.0)
-        async with httpx.AsyncClient(follow_redirects=True, timeout=timeout_config) as client:
-            response = await client.get(jwks_url)
-            response.raise_for_status()
-            jwks_dict = response.json()
+        client = _get_http_client()
+        response = await client.get(jwks_url)
+        response.raise_for_status()
+        jwks_dict = response.json()
     except Exception as e:
-        logger.warning(f"Failed to fetch JWKS from {jwks_url}: {e}")
+        logger.warning("Failed to fetch JWKS from %s: %s", jwks_url, e)
+        _defer_jwks_refresh(jwks_url)
         return None
 
     if not isinstance(jwks_dict, dict) or "keys" not in jwks_dict:
-        logger.warning(f"Invalid JWKS format from {jwks_url}")
+        logger.warning("Invalid JWKS format from %s", jwks_url)
+        _defer_jwks_refresh(jwks_url)
         return None
 
-    async with _jwks_lock:
-        _jwks_cache[jwks_url] = (jwks_dict, datetime.now() + _jwks_cache_ttl)
-
+    _jwks_cache[jwks_url] = (jwks_dict, time.monotonic() + _jwks_cache_ttl_seconds)
+    _jwks_refresh_retry_at.pop(jwks_url, None)
     return jwks_dict
 
 
+def _defer_jwks_refresh(jwks_url: str):
+    """Hold off background refreshes of a JWKS URL after a failed fetch; jittered by ±20% so retries don't line up"""
+    _jwks_refresh_retry_at[jwks_url] = time.monotonic() + _jwks_refresh_retry_seconds * random.uniform(0.8, 1.2)
+
+
+# SoftwareOne custom JWT claims
+_USER_ID_CLAIM = "https://claims.softwareone.com/userId"
+_ACCOUNT_ID_CLAIM = "https://claims.softwareone.com/accountId"
+
+
+def _prefixed_claim(payload: dict, claim: str, prefix: str) -> str | None:
+    """Return a string claim if it carries the expected ID prefix, else None."""
+    value = payload.get(claim)
+    return value if isinstance(value, str) and value.startswith(prefix) else None
+
+
 def _extract_claims_from_payload(payload: dict) -> tuple[str | None, str | None]:
     """Extract userId and accountId from SoftwareOne JWT payload."""
-    raw_user_id = payload.get("https://claims.softwareone.com/userId")
-    user_id = raw_user_id if raw_user_id and isinstance(raw_user_id, str) and raw_user_id.startswith("USR-") else None
-    raw_account_id = payload.get("https://claims.softwareone.com/accountId")
-    account_id = raw_account_id if raw_account_id and isinstance(raw_account_id, str) and raw_account_id.startswith("ACC-") else None
-    return (user_id, account_id)
+    return (_prefixed_claim(payload, _USER_ID_CLAIM, "USR-"), _prefixed_claim(payload, _ACCOUNT_ID_CLAIM, "ACC-"))
+
+
+# Verified JWT payloads by keyed digest of (token, JWKS URL) -> (payload, time.monotonic() deadline).
+# Keyed by the whole token, never the signature alone, so a payload can't be swapped under a cached signature.
+_VERIFIED_JWT_CACHE_SIZE = 1024
+_verified_jwt_cache: dict[bytes, tuple[dict, float]] = {}
 
 
 async def _verify_jwt_and_get_payload(token: str, jwks_url: str) -> tuple[dict | None, str | None]:
@@ -212,41 +407,57 @@ async def _verify_jwt_and_get_payload(token: str, jwks_url: str) -> tuple[dict |
         (payload, error_message). On success: (payload_dict, None). On failure: (None, "Token expired")
         or (None, "JWT signature or claims invalid"). If JWKS fetch failed: (None, None).
     """
+    leeway = getattr(config, "jwt_exp_leeway_seconds", 120) or 0
+
+    # Signature already verified for this exact token and key set: only the expiry check is left
+    cache_key = _hash_token(token, jwks_url)
+    cached = _verified_jwt_cache.get(cache_key)
+    if cached is not None:
+        payload, deadline = cached
+        if time.monotonic() < deadline:
+            return _check_jwt_exp(payload, leeway)
+        _verified_jwt_cache.pop(cache_key, None)
+
     jwks_dict = await _fetch_jwks_cached(jwks_url)
     if not jwks_dict:
         return (None, None)
 
-    leeway = getattr(config, "jwt_exp_leeway_seconds", 120) or 0
-
     try:
         # Decode with verify_exp=False so we can apply leeway (avoids "Token expired" when server clock is ahead)
-        payload = jose_jwt.decode(
-            token,
-            jwks_dict,
-            algorithms=JWT_ALGORITHMS,
-            options={
-                "verify_signature": True,
-                "verify_aud": False,
-                "verify_exp": False,
-                "verify_iat": True,
-                "verify_nbf": True,
-                "verify_iss": False,
-                "require_exp": False,
-            },
-        )
-        # Manual exp check with leeway: accept if exp >= now - leeway
-        exp = payload.get("exp")
-        if isinstance(exp, (int, float)) and exp < (time.time() - leeway):
-            logger.debug("JWT exp claim in past (exp=%s, leeway=%ss)", exp, leeway)
-            return (None, "Token expired")
-        return (payload, None)
+        # RSA/ECDSA verification is CPU-bound; run it off the event loop so other requests keep moving
+        payload = await asyncio.to_thread(jose_jwt.decode, token, jwks_dict, algorithms=JWT_ALGORITHMS, options=_JWT_DECODE_OPTIONS)
     except ExpiredSignatureError as e:
-        logger.debug(f"JWT verification failed (expired): {e}")
+        logger.debug("JWT verification failed (expired): %s", e)
         return (None, "Token expired")
     except JWTError as e:
-        logger.debug(f"JWT verification failed: {e}")
+        logger.debug("JWT verification failed: %s", e)
         return (None, "JWT signature or claims invalid")
 
+    result = _check_jwt_exp(payload, leeway)
+    if result[0] is not None:
+        _remember_verified_jwt(cache_key, payload, leeway)
+    return result
+
+
+def _check_jwt_exp(payload: dict, leeway: float) -> tuple[dict | None, str | None]:
+    """Manual exp check with leeway: accept if exp >= now - leeway"""
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)) and exp < (time.time() - leeway):
+        logger.debug("JWT exp claim in past (exp=%s, leeway=%ss)", exp, leeway)
+        return (None, "Token expired")
+    return (payload, None)
+
+
+def _remember_verified_jwt(cache_key: bytes, payload: dict, leeway: float) -> None:
+    """Cache a verified payload until the token expires, capped at the JWKS TTL so rotated keys take effect."""
+    lifetime = _jwks_cache_ttl_seconds
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        lifetime = min(lifetime, max(0.0, exp + leeway - time.time()))
+    _verified_jwt_cache[cache_key] = (payload, time.monotonic() + lifetime)
+    if len(_verified_jwt_cache) > _VERIFIED_JWT_CACHE_SIZE:
+        del _verified_jwt_cache[next(iter(_verified_jwt_cache))]
+
 
 def is_jwt_token(token: str) -> bool:
     """
@@ -263,8 +474,13 @@ def is_jwt_token(token: str) -> bool:
     if not token or not isinstance(token, str):
         return False
 
-    parts = token.split(".")
-    return len(parts) == 3
+    # count() scans without building the list split() would
+    return token.count(".") == 2
+
+
+def _decode_jwt_segment(segment: str) -> Any:
+    """Decode one base64url JWT segment straight to its JSON value (no signature check)."""
+    return pydantic_core.from_json(base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4)))
 
 
 def _get_jwks_url_from_token(token: str) -> str | None:
@@ -275,28 +491,35 @@ def _get_jwks_url_from_token(token: str) -> str | None:
     We only read the payload segment to get iss for the URL; the token is verified
     afterward via JWKS in _verify_jwt_and_get_payload (we do not trust claims here).
     """
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+    return _jwks_url_from_payload_segment(parts[1])
+
+
+@lru_cache(maxsize=1024)
+def _jwks_url_from_payload_segment(payload_segment: str) -> str | None:
+    """JWKS URL for an encoded payload segment; memoized so a re-validated JWT is not decoded again."""
     try:
-        parts = token.split(".")
-        if len(parts) != 3:
-            return None
         # Decode payload segment (base64url); no JWT verify API used—only parsing for iss
-        payload_b64 = parts[1]
-        padding = 4 - len(payload_b64) % 4
-        if padding != 4:
-            payload_b64 += "=" * padding
-        payload_bytes = base64.urlsafe_b64decode(payload_b64)
-        payload = json.loads(payload_bytes)
+        payload = _decode_jwt_segment(payload_segment)
         iss = payload.get("iss")
         if not iss or not isinstance(iss, str):
             return None
-        iss = iss.strip().rstrip("/")
-        if not iss.startswith("https://"):
-            return None
-        return f"{iss}/.well-known/jwks.json"
+        return _jwks_url_for_issuer(iss)
     except Exception:
         return None
 
 
+@lru_cache(maxsize=64)
+def _jwks_url_for_issuer(iss: str) -> str | None:
+    """JWKS URL for an issuer; memoized so every token from one tenant shares the same URL string."""
+    iss = iss.strip().rstrip("/")
+    if not iss.startswith("https://"):
+        return None
+    return f"{iss}/.well-known/jwks.json"
+
+
 def parse_jwt_claims(token: str) -> tuple[str | None, str | None]:
     """
     Parse user ID and account ID from a JWT token.
@@ -318,16 +541,14 @@ def parse_token_id(token: str) -> str | None:
     """
     if is_jwt_token(token):
         return None
+    return _parse_api_token_id(token)
 
-    try:
-        # idt:TKN-XXXX-XXXX:secret
-        parts = token.split(":")
-        if len(parts) >= 2 and parts[1].startswith("TKN-"):
-            return parts[1]
-        return None
-    except Exception as e:
-        logger.warning(f"Failed to parse token ID: {e}")
-        return None
+
+def _parse_api_token_id(token: str) -> str | None:
+    """Parse the TKN-... ID from a token already known not to be a JWT."""
+    # idt:TKN-XXXX-XXXX:secret; match() stops at the second colon instead of splitting the whole secret
+    match = _API_TOKEN_ID_RE.match(token)
+    return match.group(1) if match else None
 
 
 def normalize_token(token: str) -> str:
@@ -344,11 +565,56 @@ def normalize_token(token: str) -> str:
     if not token or not isinstance(token, str):
         return ""
     s = token.strip()
-    if s.upper().startswith("BEARER "):
+    # Compare only the prefix; upper() on the whole value would copy a multi-KB JWT on every request
+    if s[:7].lower() == "bearer ":
         s = s[7:].strip()
     return s
 
 
+# api-tokens response fields kept in token_info (top level and account)
+_TOKEN_INFO_FIELDS = ("id", "name", "status")
+_TOKEN_ACCOUNT_FIELDS = ("id", "name", "type")
+
+
+def _project_token_info(raw: dict) -> dict:
+    """Reduce an api-tokens response to the fields token_info consumers use."""
+    token_info = {field: raw[field] for field in _TOKEN_INFO_FIELDS if field in raw}
+    account = raw.get("account")
+    if isinstance(account, dict):
+        token_info["account"] = {field: account[field] for field in _TOKEN_ACCOUNT_FIELDS if field in account}
+    return token_info
+
+
+def _build_jwt_token_info(user_id: str, user_info: dict, account_id_from_jwt: str | None) -> dict:
+    """Build token_info for a JWT user from the users response, in the same shape as an api-tokens response."""
+    user_name = user_info.get("name", "Unknown")
+    # Use accountId from JWT if available, otherwise try API response; account name always comes from the API
+    account = user_info.get("account")
+    if not isinstance(account, dict):
+        account = {}
+    return {
+        "id": user_id,
+        "name": f"JWT User: {user_name}",
+        "status": user_info.get("status", "Unknown"),
+        "account": {
+            "id": account_id_from_jwt or account.get("id", "Unknown"),
+            "name": account.get("name", "Unknown"),
+        },
+        "user": {
+            "id": user_id,
+            "name": user_name,
+            "email": user_info.get("email", "Unknown"),
+        },
+        "type": "jwt",
+    }
+
+
+@lru_cache(maxsize=16)
+def _accounts_url(api_base_url: str) -> str:
+    """Accounts API root for an endpoint; a process only ever sees a handful of endpoints."""
+    return f"{api_base_url.rstrip('/')}/public/v1/accounts"
+
+
 async def validate_token(token: str, api_base_url: str, use_cache: bool = True) -> tuple[bool, dict | None, str | None]:
     """
     Validate an API token against the Marketplace Platform
@@ -377,263 +643,141 @@ async def validate_token(token: str, api_base_url: str, use_cache: bool = True)
     token = token.strip()
 
     cache = get_token_cache()
+    # Derived once; used for both the cache lookup and single-flight coalescing
+    cache_key = _hash_token(token, api_base_url)
 
     if use_cache:
-        cached_result = await cache.get(token, api_base_url)
+        cached_result = cache.get_by_key(cache_key)
         if cached_result is not None:
             is_valid, token_info = cached_result
 
             if is_valid and token_info:
-                account_name = token_info.get("account", {}).get("name", "Unknown")
-                account_id = token_info.get("account", {}).get("id", "Unknown")
-                logger.info(f"🔐 Token validation (CACHED): ✅ Valid - {account_name} ({account_id})")
+                account = token_info.get("account", {})
+                logger.info("🔐 Token validation (CACHED): ✅ Valid - %s (%s)", account.get("name", "Unknown"), account.get("id", "Unknown"))
             else:
                 logger.info("🔐 Token validation (CACHED): ❌ Invalid")
 
             return (is_valid, token_info, None if is_valid else "Token invalid (cached)")
 
+    # Single flight: concurrent misses for the same token share one upstream validation
+    return await cache.validate_once(cache_key, lambda: _validate_token_uncached(token, api_base_url, cache))
+
+
+async def _validate_token_uncached(token: str, api_base_url: str, cache: TokenValidationCache) -> tuple[bool, dict | None, str | None]:
+    """Validate a token against the Marketplace API (or JWKS for JWTs) and cache the outcome; see validate_token."""
     # JWT path: verify with JWKS when URL is set or can be derived from token's iss claim (e.g. Auth0)
-    is_jwt = is_jwt_token(token)
+    # API tokens (idt:...) are the common case and never JWTs, whatever their secret contains
+    is_jwt = not token.startswith(API_TOKEN_PREFIX) and is_jwt_token(token)
     account_id_from_jwt: str | None = None
 
     if is_jwt:
         jwks_url = config.jwt_jwks_url or _get_jwks_url_from_token(token)
         if not jwks_url:
             error = "JWT verification required. Set JWT_JWKS_URL or use a token with iss claim (e.g. Auth0)."
-            logger.warning(f"❌ {error}")
+            logger.warning("❌ %s", error)
             return (False, None, error)
         payload, verify_error = await _verify_jwt_and_get_payload(token, jwks_url)
         if payload is None:
             error = verify_error or "JWT signature or claims invalid"
-            logger.warning(f"❌ {error}")
+            logger.warning("❌ %s", error)
             return (False, None, error)
         user_id, account_id_from_jwt = _extract_claims_from_payload(payload)
         if not user_id or not user_id.startswith("USR-"):
             error = "JWT missing or invalid userId claim"
-            logger.warning(f"❌ {error}")
+            logger.warning("❌ %s", error)
             return (False, None, error)
         token_id = user_id
     else:
-        token_id = parse_token_id(token)
+        # Already known not to be a JWT; skip parse_token_id's repeat of that check
+        token_id = _parse_api_token_id(token)
 
     if not token_id:
         error = "Invalid token format. Expected: idt:TKN-XXXX-XXXX:secret or JWT token"
-        logger.warning(f"❌ {error}")
+        logger.warning("❌ %s", error)
         return (False, None, error)
 
-    if is_jwt and token_id.startswith("USR-"):
+    # Both token kinds are checked with one GET; only the endpoint, token_info shape and wording differ
+    if is_jwt:
         # JWT token: already verified; validate via user endpoint for status/account info
-        user_id = token_id
-
-        validation_url = f"{api_base_url.rstrip('/')}/public/v1/accounts/users/{user_id}"
-
-        try:
-            logger.info(f"🔐 Validating JWT token (user: {user_id}) against {api_base_url} (API call)...")
-
-            timeout_config = httpx.Timeout(30.0, connect=30.0)
-            async with httpx.AsyncClient(follow_redirects=True, http2=True, timeout=timeout_config) as client:
-                response = await client.get(validation_url, headers={"Authorization": f"Bearer {token}", "Accept": "application/json"})
-
-                if response.status_code == 200:
-                    user_info = response.json()
-
-                    # Extract user information
-                    user_name = user_info.get("name", "Unknown")
-                    user_email = user_info.get("email", "Unknown")
-                    user_status = user_info.get("status", "Unknown")
-
-                    # Use accountId from JWT if available, otherwise try API response
-                    if account_id_from_jwt:
-                        account_id = account_id_from_jwt
-                        # Try to get account name from API response, fallback to Unknown
-                        account_name = user_info.get("account", {}).get("name", "Unknown") if isinstance(user_info.get("account"), dict) else "Unknown"
-                    else:
-                        # Fallback to API response if JWT doesn't have accountId
-                        account_id = user_info.get("account", {}).get("id", "Unknown") if isinstance(user_info.get("account"), dict) else "Unknown"
-                        account_name = user_info.get("account", {}).get("name", "Unknown") if isinstance(user_info.get("account"), dict) else "Unknown"
-
-                    # Check if user is active
-                    if user_status != "Active":
-                        error = f"User exists but is not active (status: {user_status})"
-                        logger.warning(f"❌ User {user_id}: {error}")
-
-                        # Create token_info structure similar to API token format
-                        token_info = {
-                            "id": user_id,
-                            "name": f"JWT User: {user_name}",
-                            "status": user_status,
-                            "account": {
-                                "id": account_id,
-                                "name": account_name,
-                            },
-                            "user": {
-                                "id": user_id,
-                                "name": user_name,
-                                "email": user_email,
-                            },
-                            "type": "jwt",
-                        }
-
-                        # Cache inactive user as invalid
-                        await cache.set(token, api_base_url, False, token_info)
-
-                        return (False, token_info, error)
-
-                    logger.info(
-                        "✅ JWT token validated successfully\n"
-                        f"   User: {user_name} ({user_id})\n   Email: {user_email}\n"
-                        f"   Account: {account_name} ({account_id})\n   Status: {user_status}"
-                    )
-
-                    # Create token_info structure similar to API token format
-                    token_info = {
-                        "id": user_id,
-                        "name": f"JWT User: {user_name}",
-                        "status": user_status,
-                        "account": {
-                            "id": account_id,
-                            "name": account_name,
-                        },
-                        "user": {
-                            "id": user_id,
-                            "name": user_name,
-                            "email": user_email,
-                        },
-                        "type": "jwt",
-                    }
-
-                    # Cache successful validation
-                    await cache.set(token, api_base_url, True, token_info)
-
-                    return (True, token_info, None)
-
-                elif response.status_code == 401:
-                    error = "JWT token authentication failed (401 Unauthorized)"
-                    logger.warning(f"❌ {error}")
-
-                    # Cache failed validation
-                    await cache.set(token, api_base_url, False, None)
-
-                    return (False, None, error)
-
-                elif response.status_code == 404:
-                    error = f"User {user_id} not found (404)"
-                    logger.warning(f"❌ {error}")
-
-                    # Cache failed validation
-                    await cache.set(token, api_base_url, False, None)
-
-                    return (False, None, error)
-
-                else:
-                    error = f"JWT token validation failed with status {response.status_code}"
-                    logger.warning(f"❌ {error}")
-
-                    # Don't cache unexpected errors (might be transient)
-                    return (False, None, error)
-
-        except httpx.TimeoutException:
-            error = "JWT token validation timed out"
-            logger.error(f"❌ {error}")
-            # Don't cache timeouts (transient issue)
-            return (False, None, error)
-
-        except httpx.HTTPError as e:
-            error = f"JWT token validation failed: {str(e)}"
-            logger.error(f"❌ {error}")
-            # Don't cache HTTP errors (might be transient)
-            return (False, None, error)
-
-        except Exception as e:
-            error = f"Unexpected error during JWT token validation: {str(e)}"
-            logger.error(f"❌ {error}")
-            # Don't cache unexpected errors
-            return (False, None, error)
-
+        validation_url = f"{_accounts_url(api_base_url)}/users/{token_id}"
+        kind, subject = "JWT token", "User"
+        logger.info("🔐 Validating JWT token (user: %s) against %s (API call)...", token_id, api_base_url)
     else:
         # API token: validate via token endpoint
-        validation_url = f"{api_base_url.rstrip('/')}/public/v1/accounts/api-tokens/{token_id}"
-
-        try:
-            logger.info(f"🔐 Validating token {token_id} against {api_base_url} (API call)...")
-
-            timeout_config = httpx.Timeout(30.0, connect=30.0)
-            async with httpx.AsyncClient(follow_redirects=True, http2=True, timeout=timeout_config) as client:
-                response = await client.get(validation_url, headers={"Authorization": f"Bearer {token}", "Accept": "application/json"})
-
-                if response.status_code == 200:
-                    token_info = response.json()
-
-                    # Extract account information for logging
-                    account_id = token_info.get("account", {}).get("id", "Unknown")
-                    account_name = token_info.get("account", {}).get("name", "Unknown")
-                    token_name = token_info.get("name", "Unnamed Token")
-                    account_type = token_info.get("account", {}).get("type", "Unknown")
-                    token_status = token_info.get("status", "Unknown")
-
-                    # Check if token is active
-                    if token_status != "Active":
-                        error = f"Token exists but is not active (status: {token_status})"
-                        logger.warning(f"❌ Token {token_id}: {error}")
-
-                        # Cache inactive token as invalid
-                        await cache.set(token, api_base_url, False, token_info)
-
-                        return (False, token_info, error)
-
-                    logger.info(
-                        f"✅ Token {token_id} validated successfully\n   Token Name: {token_name}\n"
-                        f"   Account: {account_name} ({account_id})\n   Type: {account_type}\n"
-                        f"   Status: {token_status}"
-                    )
-
-                    # Cache successful validation
-                    await cache.set(token, api_base_url, True, token_info)
-
-                    return (True, token_info, None)
-
-                elif response.status_code == 401:
-                    error = "Token authentication failed (401 Unauthorized)"
-                    logger.warning(f"❌ {error}")
-
-                    # Cache failed validation (but with shorter TTL)
-                    await cache.set(token, api_base_url, False, None)
+        validation_url = f"{_accounts_url(api_base_url)}/api-tokens/{token_id}"
+        kind, subject = "Token", "Token"
+        logger.info("🔐 Validating token %s against %s (API call)...", token_id, api_base_url)
 
-                    return (False, None, error)
-
-                elif response.status_code == 404:
-                    error = f"Token {token_id} not found (404)"
-                    logger.warning(f"❌ {error}")
-
-                    # Cache failed validation
-                    await cache.set(token, api_base_url, False, None)
-
-                    return (False, None, error)
-
-                else:
-                    error = f"Token validation failed with status {response.status_code}"
-                    logger.warning(f"❌ {error}")
-
-                    # Don't cache unexpected errors (might be transient)
-                    return (False, None, error)
+    try:
+        client = _get_http_client()
+        response = await client.get(validation_url, headers={"Authorization": f"Bearer {token}", "Accept": "application/json"})
 
-        except httpx.TimeoutException:
-            error = "Token validation timed out"
-            logger.error(f"❌ {error}")
-            # Don't cache timeouts (transient issue)
+        if response.status_code == 200:
+            if is_jwt:
+                token_info = _build_jwt_token_info(token_id, response.json(), account_id_from_jwt)
+            else:
+                # Keep only what callers and the logs read, so cached entries don't retain the whole API payload
+                token_info = _project_token_info(response.json())
+            status = token_info.get("status", "Unknown")
+            account = token_info.get("account", {})
+
+            # Check if token (or JWT user) is active; inactive ones are cached as invalid
+            if status != "Active":
+                error = f"{subject} exists but is not active (status: {status})"
+                logger.warning("❌ %s %s: %s", subject, token_id, error)
+                await cache.set(token, api_base_url, False, token_info)
+                return (False, token_info, error)
+
+            if is_jwt:
+                user = token_info["user"]
+                logger.info(
+                    "✅ JWT token validated successfully\n   User: %s (%s)\n   Email: %s\n   Account: %s (%s)\n   Status: %s",
+                    user["name"],
+                    token_id,
+                    user["email"],
+                    account["name"],
+                    account["id"],
+                    status,
+                )
+            else:
+                logger.info(
+                    "✅ Token %s validated successfully\n   Token Name: %s\n   Account: %s (%s)\n   Type: %s\n   Status: %s",
+                    token_id,
+                    token_info.get("name", "Unnamed Token"),
+                    account.get("name", "Unknown"),
+                    account.get("id", "Unknown"),
+                    account.get("type", "Unknown"),
+                    status,
+                )
+
+            # Cache successful validation
+            await cache.set(token, api_base_url, True, token_info)
+            return (True, token_info, None)
+
+        if response.status_code in (401, 404):
+            if response.status_code == 401:
+                error = f"{kind} authentication failed (401 Unauthorized)"
+            else:
+                error = f"{subject} {token_id} not found (404)"
+            logger.warning("❌ %s", error)
+            # Cache failed validation (with the short negative TTL)
+            await cache.set(token, api_base_url, False, None)
             return (False, None, error)
 
-        except httpx.HTTPError as e:
-            error = f"Token validation failed: {str(e)}"
-            logger.error(f"❌ {error}")
-            # Don't cache HTTP errors (might be transient)
-            return (False, None, error)
+        error = f"{kind} validation failed with status {response.status_code}"
+        logger.warning("❌ %s", error)
+        # Don't cache unexpected errors (might be transient)
+        return (False, None, error)
 
-        except Exception as e:
-            error = f"Unexpected error during token validation: {str(e)}"
-            logger.error(f"❌ {error}")
-            # Don't cache unexpected errors
-            return (False, None, error)
+    # Don't cache timeouts, HTTP errors or unexpected errors (might be transient)
+    except httpx.TimeoutException:
+        error = f"{kind} validation timed out"
+    except httpx.HTTPError as e:
+        error = f"{kind} validation failed: {str(e)}"
+    except Exception as e:
+        error = f"Unexpected error during {'JWT token' if is_jwt else 'token'} validation: {str(e)}"
+    logger.error("❌ %s", error)
+    return (False, None, error)
 
 
 async def validate_token_for_resources(token: str, api_base_url: str) -> tuple[bool, str | None]:
@@ -100,6 +100,8 @@ class TestUserIdentificationExtraction:
         assert APIClient._extract_user_id("simple-token") is None
         assert APIClient._extract_user_id("idt:TOKEN-123:value") is None
         assert APIClient._extract_user_id("TKN-1234-5678") is None
+        assert APIClient._extract_user_id("idt:TKN-1234-5678") is None  # Missing secret part
+        assert APIClient._extract_user_id("xidt:TKN-1234-5678:token") is None
 
 
 class TestCombinedFeatures:
@@ -0,0 +1,94 @@
+"""
+Tests for the on-disk cache and fetch_with_cache revalidation
+"""
+
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from src.cache_manager import CacheManager, fetch_with_cache
+
+SPEC_URL = "https://api.test.com/public/v1/openapi.json"
+
+
+class TestFetchWithCacheRevalidation:
+    """Test ETag-based revalidation of expired cache entries"""
+
+    @pytest.fixture
+    def cache_manager(self, tmp_path):
+        """Cache manager whose entries are always expired"""
+        return CacheManager(cache_dir=str(tmp_path / "cache"), ttl_hours=0)
+
+    @pytest.mark.asyncio
+    async def test_stores_etag_from_response(self, cache_manager):
+        """Test that the ETag of a fetched document is kept with the cache entry"""
+        with patch("httpx.AsyncClient") as mock_client:
+            response = Mock(status_code=200, content=b'{"paths": {}}', headers={"ETag": '"v1"'}, history=[])
+            mock_client.return_value.__aenter__.return_value.get = AsyncMock(return_value=response)
+
+            data = await fetch_with_cache(SPEC_URL, cache_manager)
+
+        assert data == {"paths": {}}
+        assert cache_manager.get_etag(SPEC_URL) == '"v1"'
+
+    @pytest.mark.asyncio
+    async def test_not_modified_reuses_cached_document(self, cache_manager):
+        """Test that a 304 answer to the conditional GET serves and revalidates the cached copy"""
+        cache_manager.set(SPEC_URL, {"paths": {"/a": {}}}, etag='"v1"')
+
+        with patch("httpx.AsyncClient") as mock_client:
+            response = Mock(status_code=304, headers={}, history=[])
+            mock_get = AsyncMock(return_value=response)
+            mock_client.return_value.__aenter__.return_value.get = mock_get
+
+            data = await fetch_with_cache(SPEC_URL, cache_manager)
+
+        assert data == {"paths": {"/a": {}}}
+        assert mock_get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+        response.raise_for_status.assert_not_called()
+
+
+class TestParsedCache:
+    """Test objects derived from a cached entry"""
+
+    @pytest.fixture
+    def cache_manager(self, tmp_path):
+        return CacheManager(cache_dir=str(tmp_path / "cache"))
+
+    def test_parsed_round_trip_until_data_changes(self, cache_manager):
+        """Test that parsed objects come back while the cached data is unchanged"""
+        cache_manager.set(SPEC_URL, {"paths": {}})
+        cache_manager.set_parsed(SPEC_URL, ({"paths": {}}, {"catalog.products": {"path": "/a"}}))
+
+        assert cache_manager.get_parsed(SPEC_URL) == [{"paths": {}}, {"catalog.products": {"path": "/a"}}]
+
+        cache_manager.set(SPEC_URL, {"paths": {"/b": {}}})
+        assert cache_manager.get_parsed(SPEC_URL) is None
+
+    def test_parsed_file_is_never_unpickled(self, cache_manager):
+        """Test that a non-JSON parsed file is ignored rather than deserialized as code"""
+        import pickle
+
+        cache_manager.set(SPEC_URL, {"paths": {}})
+        cache_manager._get_parsed_path(SPEC_URL).write_bytes(pickle.dumps(("digest", {"paths": {}})))
+
+        assert cache_manager.get_parsed(SPEC_URL) is None
+
+    @pytest.mark.parametrize("payload", [[{"paths": {}}], [{"paths": {}}, []], [{"paths": {}}, {"catalog.products": "/a"}], "truncated"])
+    def test_malformed_parsed_payload_is_discarded(self, cache_manager, payload):
+        """Test that a parsed entry with the wrong shape is deleted so the spec gets rebuilt"""
+        cache_manager.set(SPEC_URL, {"paths": {}})
+        cache_manager.set_parsed(SPEC_URL, payload)
+
+        assert cache_manager.get_parsed(SPEC_URL) is None
+        assert not cache_manager._get_parsed_path(SPEC_URL).exists()
+
+    def test_unreadable_parsed_file_is_discarded(self, cache_manager):
+        """Test that a truncated parsed file is deleted"""
+        cache_manager.set(SPEC_URL, {"paths": {}})
+        cache_manager.set_parsed(SPEC_URL, ({"paths": {}}, {}))
+        parsed_path = cache_manager._get_parsed_path(SPEC_URL)
+        parsed_path.write_bytes(parsed_path.read_bytes()[:-5])
+
+        assert cache_manager.get_parsed(SPEC_URL) is None
+        assert not parsed_path.exists()
@@ -107,3 +107,40 @@ async def test_docs_resource_reader_uses_live_server_docs_cache(monkeypatch: pyt
     content = await docs_handler("readme")
 
     assert "Hello" in content
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_marketplace_docs_list_default_view_built_once_per_refresh(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The unfiltered listing is reused until the documentation cache refreshes."""
+
+    stub = _StubDocsCache()
+    stub.last_refresh = 1
+    calls = 0
+
+    async def _ensure_cached() -> None:
+        return None
+
+    async def _list_resources(**_: Any) -> list[dict[str, Any]]:
+        nonlocal calls
+        calls += 1
+        return stub.resources or []
+
+    stub.ensure_cached = _ensure_cached
+    stub.list_resources = _list_resources
+
+    async def _init() -> None:
+        server_docs.documentation_cache = stub
+
+    monkeypatch.setattr(server_docs, "initialize_documentation_cache", _init, raising=True)
+    monkeypatch.setattr(server_tools, "_default_docs_list", None)
+
+    first = await server_tools.marketplace_docs_list()
+    second = await server_tools.marketplace_docs_list()
+    stub.last_refresh = 2
+    third = await server_tools.marketplace_docs_list()
+
+    assert first is second
+    assert third is not first
+    assert calls == 2
+    assert first["resources"][0]["browser_url"] == "https://example.test/readme"
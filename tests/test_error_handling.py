@@ -144,6 +144,26 @@ class TestAPIErrorResponses:
 
             assert exc_info.value.response.status_code == 500
 
+    @pytest.mark.asyncio
+    async def test_waiting_for_request_slot_times_out(self):
+        """Test that a request waiting on a saturated concurrency limit still honours the timeout"""
+        import asyncio
+
+        from src import api_client
+        from src.api_client import APIClient
+
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_get = AsyncMock()
+            mock_client.return_value.__aenter__.return_value.get = mock_get
+            api_client._request_semaphores[asyncio.get_running_loop()] = asyncio.Semaphore(0)
+
+            client = APIClient("https://api.test.com", "test_token", timeout=0.01)
+
+            with pytest.raises(httpx.TimeoutException):
+                await client.get("/products")
+
+            mock_get.assert_not_awaited()
+
 
 class TestErrorMessages:
     """Test that error messages are user-friendly"""
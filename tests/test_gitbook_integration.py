@@ -171,6 +171,17 @@ class TestDocumentationCache:
         assert resource["name"] == "Getting Started"
         assert resource["mimeType"] == "text/markdown"
 
+    @pytest.mark.asyncio
+    async def test_refresh_stores_browser_url_top_level(self, mock_gitbook_client):
+        """Test indexed resources carry browser_url both in metadata and top-level"""
+        cache = DocumentationCache(gitbook_client=mock_gitbook_client, public_url="https://docs.example.com/")
+
+        await cache.refresh()
+
+        resource = cache._resources["docs://getting-started"]
+        assert resource["browser_url"] == "https://docs.example.com/getting-started"
+        assert resource["metadata"]["browser_url"] == resource["browser_url"]
+
     @pytest.mark.asyncio
     async def test_refresh_builds_resource_index_with_nested_pages(self):
         """Test refresh handles nested pages correctly"""
@@ -203,6 +203,61 @@ class TestHTTPServerTools:
         for tool_name in debug_tools:
             assert tool_name not in tool_names, f"Debug tool {tool_name} should not be in production server"
 
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_tool_context_errors_carry_tool_payload(self):
+        """Test that auth and spec load failures surface as the payloads the tools return"""
+        from src import server_tools
+
+        with patch("src.server_tools.get_client_api_client_http", new_callable=AsyncMock, side_effect=ValueError("Missing token")):
+            with pytest.raises(server_tools._ToolContextError) as auth_error:
+                await server_tools._load_tool_context()
+        assert auth_error.value.response == {"error": "Missing token", "hint": server_tools.AUTH_HINT_HEADER_TOKEN}
+
+        api_client = Mock(base_url="https://api.test.com")
+        with (
+            patch("src.server_tools.get_client_api_client_http", new_callable=AsyncMock, return_value=api_client),
+            patch("src.endpoint_registry.get_endpoints_registry", new_callable=AsyncMock, side_effect=RuntimeError("boom")),
+        ):
+            with pytest.raises(server_tools._ToolContextError) as load_error:
+                await server_tools._load_tool_context(load_error=server_tools._audit_spec_load_error)
+        assert load_error.value.response == {
+            "error": f"{server_tools.OPENAPI_SPEC_LOAD_ERROR} for audit fields",
+            "details": "boom",
+            "api_endpoint": "https://api.test.com",
+        }
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_marketplace_resources_built_once_per_registry(self):
+        """Test that the resource catalog is reused across users until the registry changes"""
+        from src import server_tools
+        from src.server import mcp
+        from src.server_context import _current_user_id
+
+        tool = await mcp.get_tool("marketplace_resources")
+        api_client = Mock(base_url="https://api.resources-cache-test.com")
+        registry = {"catalog.products": {"path": "/public/v1/catalog/products", "summary": "List products", "parameters": []}}
+
+        with (
+            patch("src.server_tools.get_client_api_client_http", new_callable=AsyncMock, return_value=api_client),
+            patch("src.endpoint_registry.get_endpoints_registry", new_callable=AsyncMock, return_value=registry),
+            patch("src.server_tools.execute_marketplace_resources", wraps=server_tools.execute_marketplace_resources) as execute,
+        ):
+            token = _current_user_id.set("USR-1")
+            try:
+                first = await tool.fn()
+                _current_user_id.set("USR-2")
+                second = await tool.fn()
+            finally:
+                _current_user_id.reset(token)
+
+        assert execute.call_count == 1
+        assert first["user"] == "USR-1"
+        assert second["user"] == "USR-2"
+        assert second["categories"] is first["categories"]
+        assert first["total_resources"] == 1
+
 
 class TestMarketplaceDocsList:
     """Test marketplace_docs_list MCP tool response shape (browser_url, usage)."""
@@ -239,8 +294,16 @@ class TestMarketplaceDocsList:
         assert len(result["resources"]) == 1
         assert result["resources"][0]["browser_url"] == "https://docs.example.com/help-and-support/contact-support"
         assert "Prefer showing users the browser_url" in result["usage"]
+        assert result["filters_applied"] == {"search": "contact support"}
         assert "do not show internal uri or id" in result["usage"]
 
+    @pytest.mark.unit
+    def test_docs_list_without_filters_reports_empty_dict(self):
+        """filters_applied is always a dict, empty when no filter was given"""
+        from src.server_tools import _build_docs_list_result
+
+        assert _build_docs_list_result([], None, None, None, 10)["filters_applied"] == {}
+
     @pytest.mark.unit
     @pytest.mark.asyncio
     async def test_marketplace_docs_list_no_browser_url_when_metadata_missing(self):
@@ -385,3 +448,56 @@ class TestGetClientApiClientHttp:
         finally:
             _current_token.reset(token_ctx)
             _current_endpoint.reset(endpoint_ctx)
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_api_clients_share_one_pool(self, monkeypatch):
+        """Each call gets its own APIClient (nothing keeps the token), but all share one connection pool."""
+        import httpx
+
+        from src import api_client
+        from src.api_client import APIClient
+        from src.server_context import _current_endpoint, _current_token, get_client_api_client_http
+
+        monkeypatch.setattr(api_client, "_shared_clients", type(api_client._shared_clients)())
+        token_ctx = _current_token.set("idt:TKN-1111-1111:A")
+        endpoint_ctx = _current_endpoint.set("https://api.test.com")
+        try:
+            first = await get_client_api_client_http(validate_token=False)
+            _current_token.set("idt:TKN-2222-2222:B")
+            second = await get_client_api_client_http(validate_token=False)
+        finally:
+            _current_token.reset(token_ctx)
+            _current_endpoint.reset(endpoint_ctx)
+
+        pool = await first._get_client()
+        assert second is not first
+        assert await second._get_client() is pool
+        assert first._get_headers()["Authorization"] != second._get_headers()["Authorization"]
+
+        timed = APIClient(base_url="https://api.test.com", token="idt:TKN-3333-3333:C", timeout=5.0, shared_pool=True)
+        with patch.object(pool, "get", new_callable=AsyncMock, return_value=Mock()) as pool_get:
+            await timed.get_raw("/public/v1/catalog/products")
+        assert pool_get.call_args.kwargs["timeout"] == httpx.Timeout(5.0, connect=30.0)
+
+        async with server._lifespan(server.mcp):
+            pass
+        assert pool.is_closed
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_lifespan_closes_token_validation_client(self, monkeypatch):
+        """Shutting the server down closes the shared token validation HTTP client."""
+        import asyncio
+        import weakref
+
+        from src import token_validator
+
+        validation_client = AsyncMock()
+        monkeypatch.setattr(token_validator, "_http_clients", weakref.WeakKeyDictionary({asyncio.get_running_loop(): validation_client}))
+
+        async with server._lifespan(server.mcp):
+            pass
+
+        validation_client.aclose.assert_awaited_once()
+        assert asyncio.get_running_loop() not in token_validator._http_clients
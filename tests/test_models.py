@@ -87,6 +87,46 @@ class TestEndpointInfo:
         assert len(endpoint.parameters) == 0
         assert len(endpoint.responses) == 0
 
+    def test_endpoint_infos_from_openapi_parser(self):
+        """Test that OpenAPIParser extracts GET endpoints as EndpointInfo."""
+        from src.openapi_parser import OpenAPIParser
+
+        spec = {
+            "paths": {
+                "/public/v1/catalog/products": {"get": {"summary": "List products", "parameters": [{"name": "limit", "in": "query"}]}},
+                "/public/v1/catalog/items": {"post": {"summary": "Create item"}},
+            }
+        }
+
+        endpoints = OpenAPIParser().extract_endpoint_infos(spec)
+
+        assert len(endpoints) == 1
+        assert isinstance(endpoints[0], EndpointInfo)
+        assert endpoints[0].method == "GET"
+        assert endpoints[0].path == "/public/v1/catalog/products"
+        assert endpoints[0].summary == "List products"
+        assert endpoints[0].parameters == [{"name": "limit", "in": "query"}]
+
+    def test_prune_spec_keeps_only_get_operations(self):
+        """Test that pruning drops non-GET operations but keeps components."""
+        from src.openapi_parser import prune_spec_to_get_operations
+
+        get_op = {"summary": "List products"}
+        spec = {
+            "openapi": "3.0.0",
+            "paths": {
+                "/public/v1/catalog/products": {"get": get_op, "post": {"summary": "Create product"}},
+                "/public/v1/catalog/items": {"post": {"summary": "Create item"}},
+            },
+            "components": {"schemas": {"Product": {"type": "object"}}},
+        }
+
+        pruned = prune_spec_to_get_operations(spec)
+
+        assert pruned["paths"] == {"/public/v1/catalog/products": {"get": get_op}}
+        assert pruned["components"] is spec["components"]
+        assert "post" in spec["paths"]["/public/v1/catalog/products"]
+
 
 class TestToolRequest:
     """Test ToolRequest model."""
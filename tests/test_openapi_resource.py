@@ -236,3 +236,28 @@ class TestEndpointRegistryOpenAPI:
 
             assert spec == mock_spec
             mock_fetch.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_cold_requests_fetch_spec_once(self):
+        """Test that concurrent requests for an unloaded endpoint share one registry build"""
+        import asyncio
+
+        from src.endpoint_registry import clear_registry, get_endpoints_registry, get_openapi_spec
+
+        endpoint = "https://api.concurrent-test-endpoint.com"
+        clear_registry(endpoint)
+        mock_spec = {"openapi": "3.0.0", "paths": {"/public/v1/catalog/products": {"get": {"summary": "List products"}}}}
+
+        async def slow_fetch(api_base_url, force_refresh=False):
+            await asyncio.sleep(0)
+            return mock_spec
+
+        with patch("src.endpoint_registry.fetch_openapi_spec", new_callable=AsyncMock) as mock_fetch:
+            mock_fetch.side_effect = slow_fetch
+
+            results = await asyncio.gather(get_endpoints_registry(endpoint), get_openapi_spec(endpoint), get_endpoints_registry(endpoint))
+
+        assert mock_fetch.call_count == 1
+        assert "catalog.products" in results[0]
+        assert results[1] == mock_spec
+        assert results[2] is results[0]
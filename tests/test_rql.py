@@ -213,6 +213,44 @@ class TestRQLImplementation:
             page2_ids = [p["id"] for p in page2["data"]]
             assert page1_ids != page2_ids
 
+    @pytest.mark.asyncio
+    async def test_requests_reuse_one_pooled_client(self, api_client, mock_product_response):
+        """Test that consecutive queries share one HTTP client until it is closed"""
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_response = Mock()
+            mock_response.json.return_value = mock_product_response
+            mock_response.raise_for_status = Mock()
+
+            pooled = mock_client.return_value.__aenter__.return_value
+            pooled.get = AsyncMock(return_value=mock_response)
+            pooled.aclose = AsyncMock()
+
+            await api_client.get("/public/v1/catalog/products", params={"limit": 1})
+            await api_client.get("/public/v1/catalog/products", params={"rql": "eq(status,Published)"})
+
+            assert mock_client.call_count == 1
+            assert pooled.get.await_count == 2
+
+            await api_client.aclose()
+            pooled.aclose.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_context_manager_closes_pooled_client(self, mock_product_response):
+        """Test that leaving an APIClient context closes its pooled HTTP client"""
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_response = Mock()
+            mock_response.json.return_value = mock_product_response
+            mock_response.raise_for_status = Mock()
+
+            pooled = mock_client.return_value.__aenter__.return_value
+            pooled.get = AsyncMock(return_value=mock_response)
+            pooled.aclose = AsyncMock()
+
+            async with APIClient(base_url="https://api.test.com", token="test_token") as client:
+                await client.get("/public/v1/catalog/products")
+
+            pooled.aclose.assert_awaited_once()
+
 
 def test_rql_syntax():
     """Test that RQL syntax is properly understood"""
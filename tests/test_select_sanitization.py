@@ -14,7 +14,9 @@ import pytest
 
 from src.mcp_tools import (
     _get_allowed_select_fields,
+    _resolve_spec_ref,
     _sanitize_select,
+    build_components_index,
     execute_marketplace_query,
 )
 
@@ -71,6 +73,30 @@ class TestGetAllowedSelectFields:
         assert allowed == {"id", "status", "audit"}
         assert "orderNumber" not in allowed
 
+    def test_resolves_response_ref_through_components_index(self):
+        item = {"type": "object", "properties": {"id": {"type": "string"}, "name": {"type": "string"}}}
+        spec = {
+            "paths": {"/public/v1/catalog/products": {"get": {"responses": {"200": {"content": {"application/json": {"schema": {"$ref": "#/components/schemas/ProductList"}}}}}}}},
+            "components": {"schemas": {"ProductList": {"type": "object", "properties": {"data": {"type": "array", "items": item}}}}},
+        }
+        registry = {"catalog.products": {"path": "/public/v1/catalog/products"}}
+        index = build_components_index(spec)
+
+        assert index["#/components/schemas/ProductList"] is spec["components"]["schemas"]["ProductList"]
+        assert _get_allowed_select_fields(spec, registry, "catalog.products", index) == {"id", "name"}
+        assert _get_allowed_select_fields(spec, registry, "catalog.products") == {"id", "name"}
+
+
+class TestResolveSpecRef:
+    """Test _resolve_spec_ref."""
+
+    def test_falls_back_to_walking_spec_when_ref_not_indexed(self):
+        spec = {"definitions": {"Order": {"type": "object"}}}
+        assert _resolve_spec_ref(spec, "#/definitions/Order", {}) == {"type": "object"}
+
+    def test_missing_ref_resolves_to_empty_dict(self):
+        assert _resolve_spec_ref({}, "#/components/schemas/Missing", None) == {}
+
 
 class TestSanitizeSelect:
     """Test _sanitize_select."""
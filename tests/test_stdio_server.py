@@ -7,6 +7,19 @@ import pytest
 
 from src import server_stdio
 
+# Module globals initialize_server rebinds; restored after tests that initialize
+_STDIO_STATE = (
+    "api_client",
+    "endpoints_registry",
+    "openapi_spec",
+    "cache_manager",
+    "_initialized",
+    "_resource_ids",
+    "_resources_response",
+    "_schema_cache",
+    "_components_index",
+)
+
 
 class TestSTDIOServer:
     """Test STDIO server functionality for local development"""
@@ -90,3 +103,130 @@ class TestSTDIOServerTools:
 
         # STDIO should have cache management tools for debugging
         assert "marketplace_cache_info" in stdio_tools, "STDIO server should have marketplace_cache_info for debugging"
+
+
+class TestSTDIOServerInitialization:
+    """Test lazy initialization of the STDIO server"""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_concurrent_initialization_fetches_spec_once(self, monkeypatch, tmp_path):
+        """Test that concurrent first tool calls share a single spec fetch"""
+        import asyncio
+        from unittest.mock import AsyncMock, MagicMock
+
+        spec = {"paths": {"/public/v1/catalog/products": {"get": {"summary": "List products"}}}}
+
+        async def slow_fetch(**kwargs):
+            await asyncio.sleep(0)
+            return spec
+
+        fetch = AsyncMock(side_effect=slow_fetch)
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(server_stdio.config, "validate", lambda: [])
+        monkeypatch.setattr(server_stdio, "fetch_with_cache", fetch)
+        monkeypatch.setattr("src.audit_fields.update_cache", MagicMock())
+        for name in _STDIO_STATE:
+            monkeypatch.setattr(server_stdio, name, getattr(server_stdio, name))
+        monkeypatch.setattr(server_stdio, "_initialized", False)
+
+        await asyncio.gather(*(server_stdio.initialize_server() for _ in range(5)))
+
+        assert fetch.await_count == 1
+        assert "catalog.products" in server_stdio.endpoints_registry
+        assert server_stdio._resources_response["total_resources"] == 1
+        # Published read-only, so tool calls can never mutate the shared registry
+        with pytest.raises(TypeError):
+            server_stdio.endpoints_registry["catalog.items"] = {}
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_resource_schema_is_cached_per_resource(self, monkeypatch):
+        """Test that marketplace_resource_schema walks the spec once per known resource"""
+        from unittest.mock import MagicMock
+
+        execute = MagicMock(return_value={"resource": "catalog.products"})
+        monkeypatch.setattr(server_stdio, "execute_marketplace_resource_schema", execute)
+        monkeypatch.setattr(server_stdio, "_initialized", True)
+        monkeypatch.setattr(server_stdio, "openapi_spec", {"paths": {}})
+        monkeypatch.setattr(server_stdio, "endpoints_registry", {"catalog.products": {"path": "/public/v1/catalog/products"}})
+        monkeypatch.setattr(server_stdio, "_schema_cache", {})
+
+        first = await server_stdio.marketplace_resource_schema("catalog.products")
+        second = await server_stdio.marketplace_resource_schema("catalog.products")
+        await server_stdio.marketplace_resource_schema("unknown.resource")
+
+        assert first is second
+        assert execute.call_count == 2
+        assert list(server_stdio._schema_cache) == ["catalog.products"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_refresh_with_unchanged_spec_skips_rebuild(self, monkeypatch, tmp_path):
+        """Test that a forced refresh returning the same spec keeps the existing registry"""
+        from unittest.mock import AsyncMock, MagicMock
+
+        spec = {"paths": {"/public/v1/catalog/products": {"get": {"summary": "List products"}}}}
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(server_stdio.config, "validate", lambda: [])
+        monkeypatch.setattr(server_stdio, "fetch_with_cache", AsyncMock(side_effect=lambda **kwargs: dict(spec)))
+        monkeypatch.setattr("src.audit_fields.update_cache", MagicMock())
+        for name in _STDIO_STATE:
+            monkeypatch.setattr(server_stdio, name, getattr(server_stdio, name))
+        monkeypatch.setattr(server_stdio, "_initialized", False)
+
+        await server_stdio.initialize_server()
+        registry = server_stdio.endpoints_registry
+        await server_stdio.initialize_server(force_refresh=True)
+
+        assert server_stdio.endpoints_registry is registry
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_warm_start_uses_parsed_spec_cache(self, monkeypatch, tmp_path):
+        """Test that a restart with an unchanged cached spec skips fetching and parsing it"""
+        from unittest.mock import AsyncMock, MagicMock
+
+        from src.cache_manager import CacheManager
+
+        spec = {"paths": {"/public/v1/catalog/products": {"get": {"summary": "List products"}}}}
+        monkeypatch.chdir(tmp_path)
+        CacheManager(cache_dir=".cache").set(server_stdio.config.openapi_spec_url, spec)
+        fetch = AsyncMock(return_value=spec)
+        monkeypatch.setattr(server_stdio.config, "validate", lambda: [])
+        monkeypatch.setattr(server_stdio, "fetch_with_cache", fetch)
+        monkeypatch.setattr("src.audit_fields.update_cache", MagicMock())
+        for name in _STDIO_STATE:
+            monkeypatch.setattr(server_stdio, name, getattr(server_stdio, name))
+
+        monkeypatch.setattr(server_stdio, "_initialized", False)
+        await server_stdio.initialize_server()
+        registry = server_stdio.endpoints_registry
+
+        # Simulate a fresh process
+        monkeypatch.setattr(server_stdio, "_initialized", False)
+        monkeypatch.setattr(server_stdio, "endpoints_registry", {})
+        await server_stdio.initialize_server()
+
+        assert fetch.await_count == 1
+        assert server_stdio.endpoints_registry == registry
+
+        # Any change to the cached spec invalidates the parsed copy
+        server_stdio.cache_manager.set(server_stdio.config.openapi_spec_url, {"paths": {}})
+        assert server_stdio.cache_manager.get_parsed(server_stdio.config.openapi_spec_url) is None
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_lifespan_initializes_in_background(self, monkeypatch):
+        """Test that startup kicks off initialization and tolerates it failing"""
+        import asyncio
+        from unittest.mock import AsyncMock
+
+        init = AsyncMock(side_effect=ValueError("Invalid configuration"))
+        monkeypatch.setattr(server_stdio, "initialize_server", init)
+        monkeypatch.setattr(server_stdio, "api_client", None)
+
+        async with server_stdio._lifespan(server_stdio.mcp):
+            await asyncio.sleep(0)
+
+        init.assert_awaited_once_with()
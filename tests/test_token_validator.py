@@ -3,7 +3,9 @@
 Tests for token validation functionality including secure hashing and caching
 """
 
-from datetime import datetime, timedelta
+import time
+import weakref
+from datetime import timedelta
 from unittest.mock import AsyncMock, patch
 
 import pytest
@@ -39,9 +41,10 @@ class TestTokenValidationCache:
         hash2 = _hash_token(token, endpoint)
 
         assert hash1 == hash2
-        assert len(hash1) == 64  # SHA256 produces 64 hex characters
-        assert token not in hash1  # Secret should not be in hash
-        assert endpoint not in hash1  # Endpoint should not be in hash
+        assert isinstance(hash1, bytes)
+        assert len(hash1) == 16  # 16-byte BLAKE2b digest
+        assert token.encode() not in hash1  # Secret should not be in hash
+        assert endpoint.encode() not in hash1  # Endpoint should not be in hash
 
     @pytest.mark.unit
     def test_hash_token_different_for_different_inputs(self):
@@ -101,13 +104,105 @@ class TestTokenValidationCache:
 
         # Manually expire it by modifying the expiry time
         cache_key = _hash_token(token, endpoint)
-        is_valid, expiry_time, token_info_cached = cache._cache[cache_key]
-        cache._cache[cache_key] = (is_valid, datetime.now() - timedelta(seconds=1), token_info_cached)
+        cache._cache[cache_key] = cache._cache[cache_key]._replace(expiry=time.monotonic() - 1)
 
         # Should return None now
         result = await cache.get(token, endpoint)
         assert result is None
 
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_cache_sweeps_expired_entries_on_set(self):
+        """Test that expired entries for tokens never looked up again are swept"""
+        cache = TokenValidationCache(ttl_minutes=60)
+        endpoint = "https://api.test.com"
+
+        await cache.set("idt:TKN-1111-1111-OLD", endpoint, is_valid=True)
+        old_key = _hash_token("idt:TKN-1111-1111-OLD", endpoint)
+        cache._cache[old_key] = cache._cache[old_key]._replace(expiry=time.monotonic() - 1)
+        cache._next_sweep = 0.0
+
+        await cache.set("idt:TKN-2222-2222-NEW", endpoint, is_valid=True)
+
+        assert old_key not in cache._cache
+        assert len(cache._cache) == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_cache_evicts_oldest_beyond_max_entries(self):
+        """Test that the cache stays bounded by evicting the oldest entry"""
+        cache = TokenValidationCache(max_entries=2)
+        endpoint = "https://api.test.com"
+
+        await cache.set("idt:TKN-1111-1111-A", endpoint, is_valid=True)
+        await cache.set("idt:TKN-2222-2222-B", endpoint, is_valid=True)
+        await cache.set("idt:TKN-1111-1111-A", endpoint, is_valid=True)  # Refreshed, now newest
+        await cache.set("idt:TKN-3333-3333-C", endpoint, is_valid=True)
+
+        assert len(cache._cache) == 2
+        assert await cache.get("idt:TKN-2222-2222-B", endpoint) is None
+        assert await cache.get("idt:TKN-1111-1111-A", endpoint) is not None
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_cache_hit_protects_entry_from_eviction(self):
+        """Test that a cache hit makes the entry most recently used"""
+        cache = TokenValidationCache(max_entries=2)
+        endpoint = "https://api.test.com"
+
+        await cache.set("idt:TKN-1111-1111-A", endpoint, is_valid=True)
+        await cache.set("idt:TKN-2222-2222-B", endpoint, is_valid=True)
+        assert await cache.get("idt:TKN-1111-1111-A", endpoint) is not None
+        await cache.set("idt:TKN-3333-3333-C", endpoint, is_valid=True)
+
+        assert await cache.get("idt:TKN-2222-2222-B", endpoint) is None
+        assert await cache.get("idt:TKN-1111-1111-A", endpoint) is not None
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_cache_bounds_invalid_results_separately(self):
+        """Test that a burst of invalid tokens evicts only other invalid results"""
+        cache = TokenValidationCache(max_entries=2, max_negative_entries=2)
+        endpoint = "https://api.test.com"
+
+        await cache.set("idt:TKN-1111-1111-GOOD", endpoint, is_valid=True)
+        for i in range(5):
+            await cache.set(f"idt:TKN-9999-000{i}-BAD", endpoint, is_valid=False)
+
+        assert await cache.get("idt:TKN-1111-1111-GOOD", endpoint) == (True, None)
+        assert len(cache._negative_cache) == 2
+        assert await cache.get("idt:TKN-9999-0004-BAD", endpoint) == (False, None)
+        assert await cache.get("idt:TKN-9999-0000-BAD", endpoint) is None
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_cache_result_moves_between_valid_and_invalid(self):
+        """Test that re-caching a token with the opposite result replaces the old entry"""
+        cache = TokenValidationCache()
+        endpoint = "https://api.test.com"
+
+        await cache.set("idt:TKN-1111-1111-A", endpoint, is_valid=False)
+        await cache.set("idt:TKN-1111-1111-A", endpoint, is_valid=True)
+
+        assert await cache.get("idt:TKN-1111-1111-A", endpoint) == (True, None)
+        assert len(cache._negative_cache) == 0
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_cache_invalid_results_use_short_ttl(self):
+        """Test that invalid results expire after the jittered negative TTL, not the full TTL"""
+        cache = TokenValidationCache(ttl_minutes=60, negative_ttl_seconds=30)
+        endpoint = "https://api.test.com"
+
+        before = time.monotonic()
+        await cache.set("idt:TKN-1111-1111-BAD", endpoint, is_valid=False)
+        await cache.set("idt:TKN-2222-2222-GOOD", endpoint, is_valid=True)
+
+        invalid_expiry = cache._negative_cache[_hash_token("idt:TKN-1111-1111-BAD", endpoint)].expiry
+        valid_expiry = cache._cache[_hash_token("idt:TKN-2222-2222-GOOD", endpoint)].expiry
+        assert before + 24 <= invalid_expiry <= time.monotonic() + 36
+        assert valid_expiry >= before + 3600
+
     @pytest.mark.unit
     @pytest.mark.asyncio
     async def test_cache_stores_invalid_tokens(self):
@@ -147,6 +242,28 @@ class TestTokenValidationCache:
         result = await cache.get(token, endpoint)
         assert result is None
 
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_cache_validate_once_shares_concurrent_runs(self):
+        """Concurrent validate_once calls for one key run a single validation"""
+        import asyncio
+
+        cache = TokenValidationCache()
+        cache_key = _hash_token("idt:TKN-1234-5678-SECRET", "https://api.test.com")
+        calls = 0
+
+        async def validate():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0)
+            return (True, {"id": "TKN-1234-5678"}, None)
+
+        results = await asyncio.gather(*(cache.validate_once(cache_key, validate) for _ in range(5)))
+
+        assert calls == 1
+        assert results == [(True, {"id": "TKN-1234-5678"}, None)] * 5
+        assert cache._inflight == {}
+
     @pytest.mark.unit
     @pytest.mark.asyncio
     async def test_cache_get_stats(self):
@@ -171,6 +288,17 @@ class TestTokenValidationCache:
 class TestParseTokenId:
     """Test token ID parsing"""
 
+    @pytest.mark.unit
+    def test_is_jwt_token_requires_exactly_three_segments(self):
+        """Test that only header.payload.signature shaped tokens count as JWTs"""
+        from src.token_validator import is_jwt_token
+
+        assert is_jwt_token("header.payload.signature") is True
+        assert is_jwt_token("header.payload") is False
+        assert is_jwt_token("a.b.c.d") is False
+        assert is_jwt_token("idt:TKN-1234-5678:SECRET") is False
+        assert is_jwt_token("") is False
+
     @pytest.mark.unit
     def test_parse_tkn_token(self):
         """Test parsing TKN-formatted tokens"""
@@ -216,6 +344,12 @@ class TestParseTokenId:
         # parse_token_id extracts the TKN part
         assert token_id == "TKN-1234-5678"
 
+    @pytest.mark.unit
+    def test_parse_token_id_ignores_colons_in_secret(self):
+        """Test that only the second colon-separated field is taken as the ID"""
+        assert parse_token_id("idt:TKN-1234-5678:SE:CR:ET") == "TKN-1234-5678"
+        assert parse_token_id("idt::TKN-1234-5678") is None
+
     @pytest.mark.unit
     def test_parse_token_id_jwt_returns_none(self):
         """JWT: we do not decode without verification; parse_token_id returns None (user ID from validate_token only)"""
@@ -238,6 +372,61 @@ class TestParseJwtClaims:
         out = parse_jwt_claims("header.payload.signature")
         assert out == (None, None)
 
+    @pytest.mark.unit
+    def test_extract_claims_from_verified_payload(self):
+        """Verified payload claims are kept only with the expected USR-/ACC- prefixes"""
+        from src.token_validator import _extract_claims_from_payload
+
+        payload = {"https://claims.softwareone.com/userId": "USR-1234", "https://claims.softwareone.com/accountId": "ACC-5678"}
+        assert _extract_claims_from_payload(payload) == ("USR-1234", "ACC-5678")
+
+        payload = {"https://claims.softwareone.com/userId": "TKN-1234", "https://claims.softwareone.com/accountId": 5678}
+        assert _extract_claims_from_payload(payload) == (None, None)
+
+
+class TestGetJwksUrlFromToken:
+    """JWKS URL derivation from the unverified iss claim"""
+
+    @pytest.mark.unit
+    def test_jwks_url_from_unpadded_payload(self):
+        """Unpadded base64url payloads decode and yield {iss}/.well-known/jwks.json"""
+        import base64
+
+        from src.token_validator import _get_jwks_url_from_token
+
+        payload = base64.urlsafe_b64encode(b'{"iss":"https://login.example.com/"}').rstrip(b"=").decode()
+
+        assert _get_jwks_url_from_token(f"header.{payload}.signature") == "https://login.example.com/.well-known/jwks.json"
+        assert _get_jwks_url_from_token("header.not-base64-json.signature") is None
+
+    @pytest.mark.unit
+    def test_jwks_url_memoized_per_payload_segment(self):
+        """Re-validating the same JWT reuses the decoded issuer"""
+        import base64
+
+        from src.token_validator import _get_jwks_url_from_token, _jwks_url_from_payload_segment
+
+        payload = base64.urlsafe_b64encode(b'{"iss":"https://memo.example.com"}').rstrip(b"=").decode()
+        _get_jwks_url_from_token(f"header.{payload}.signature1")
+        hits = _jwks_url_from_payload_segment.cache_info().hits
+
+        assert _get_jwks_url_from_token(f"header.{payload}.signature2") == "https://memo.example.com/.well-known/jwks.json"
+        assert _jwks_url_from_payload_segment.cache_info().hits == hits + 1
+
+    @pytest.mark.unit
+    def test_jwks_url_shared_per_issuer(self):
+        """Different tokens from the same issuer resolve to the same URL object"""
+        import base64
+
+        from src.token_validator import _get_jwks_url_from_token
+
+        first = base64.urlsafe_b64encode(b'{"iss":"https://tenant.example.com","sub":"a"}').rstrip(b"=").decode()
+        second = base64.urlsafe_b64encode(b'{"iss":"https://tenant.example.com","sub":"b"}').rstrip(b"=").decode()
+
+        url = _get_jwks_url_from_token(f"header.{first}.signature")
+        assert url == "https://tenant.example.com/.well-known/jwks.json"
+        assert _get_jwks_url_from_token(f"header.{second}.signature") is url
+
 
 class TestNormalizeToken:
     """Test token normalization (used by HTTP server middleware)"""
@@ -247,6 +436,8 @@ class TestNormalizeToken:
         """Bearer prefix is stripped so cache key and API call use raw token"""
         assert normalize_token("Bearer idt:TKN-1234-5678:SECRET") == "idt:TKN-1234-5678:SECRET"
         assert normalize_token("bearer idt:TKN-X:Y") == "idt:TKN-X:Y"
+        assert normalize_token("BEARER idt:TKN-X:Y") == "idt:TKN-X:Y"
+        assert normalize_token("Bearerx idt:TKN-X:Y") == "Bearerx idt:TKN-X:Y"
 
     @pytest.mark.unit
     def test_normalize_strips_whitespace(self):
@@ -266,6 +457,11 @@ class TestNormalizeToken:
 class TestValidateToken:
     """Test the main token validation function"""
 
+    @pytest.fixture(autouse=True)
+    def reset_http_client(self, monkeypatch):
+        """Each test patches httpx.AsyncClient, so don't reuse a client opened by another test"""
+        monkeypatch.setattr("src.token_validator._http_clients", weakref.WeakKeyDictionary())
+
     @pytest.mark.asyncio
     async def test_validate_token_success(self):
         """Test successful token validation"""
@@ -290,7 +486,7 @@ class TestValidateToken:
 
             mock_client = AsyncMock()
             mock_client.get = AsyncMock(return_value=mock_response_obj)
-            mock_client_class.return_value.__aenter__.return_value = mock_client
+            mock_client_class.return_value = mock_client
 
             is_valid, token_info, error = await validate_token(token, api_base_url, use_cache=False)
 
@@ -298,6 +494,107 @@ class TestValidateToken:
             assert token_info == mock_response
             assert error is None
 
+    @pytest.mark.asyncio
+    async def test_validate_token_reuses_http_client(self):
+        """Test that validation misses share one pooled HTTP client"""
+        from src.token_validator import close_http_client
+
+        mock_response = {"id": "TKN-1234-5678", "status": "Active", "account": {"id": "ACC-123-456", "name": "Test Account"}}
+
+        with patch("src.token_validator.httpx.AsyncClient") as mock_client_class:
+            mock_response_obj = AsyncMock()
+            mock_response_obj.status_code = 200
+            mock_response_obj.json = lambda: mock_response
+
+            mock_client = AsyncMock()
+            mock_client.get = AsyncMock(return_value=mock_response_obj)
+            mock_client_class.return_value = mock_client
+
+            await validate_token("idt:TKN-1234-5678:SECRET1", "https://api.test.com", use_cache=False)
+            await validate_token("idt:TKN-1234-5678:SECRET2", "https://api.test.com", use_cache=False)
+            await close_http_client()
+
+        assert mock_client_class.call_count == 1
+        assert mock_client.get.await_count == 2
+        mock_client.aclose.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_validations_share_one_request(self):
+        """Test that concurrent misses for the same token make a single upstream call"""
+        import asyncio
+
+        mock_response = {"id": "TKN-1234-5678", "status": "Active", "account": {"id": "ACC-123-456", "name": "Test Account"}}
+
+        async def slow_get(*args, **kwargs):
+            await asyncio.sleep(0)
+            mock_response_obj = AsyncMock()
+            mock_response_obj.status_code = 200
+            mock_response_obj.json = lambda: mock_response
+            return mock_response_obj
+
+        with patch("src.token_validator.httpx.AsyncClient") as mock_client_class:
+            mock_client = AsyncMock()
+            mock_client.get = AsyncMock(side_effect=slow_get)
+            mock_client_class.return_value = mock_client
+
+            results = await asyncio.gather(*(validate_token("idt:TKN-1234-5678:CONCURRENT", "https://api.test.com", use_cache=False) for _ in range(5)))
+
+        assert mock_client.get.await_count == 1
+        assert all(result == (True, mock_response, None) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_validate_token_keeps_only_used_fields(self):
+        """Test that token_info drops API response fields nothing reads"""
+        mock_response = {
+            "id": "TKN-1234-5678",
+            "status": "Active",
+            "name": "Test Token",
+            "account": {"id": "ACC-123-456", "name": "Test Account", "type": "Vendor", "icon": "/icon.png"},
+            "audit": {"created": {"at": "2024-01-01T00:00:00Z"}},
+            "$meta": {"omitted": ["description"]},
+        }
+
+        with patch("src.token_validator.httpx.AsyncClient") as mock_client_class:
+            mock_response_obj = AsyncMock()
+            mock_response_obj.status_code = 200
+            mock_response_obj.json = lambda: mock_response
+
+            mock_client = AsyncMock()
+            mock_client.get = AsyncMock(return_value=mock_response_obj)
+            mock_client_class.return_value = mock_client
+
+            is_valid, token_info, _ = await validate_token("idt:TKN-1234-5678:PROJECTED", "https://api.test.com", use_cache=False)
+
+        assert is_valid is True
+        assert token_info == {
+            "id": "TKN-1234-5678",
+            "status": "Active",
+            "name": "Test Token",
+            "account": {"id": "ACC-123-456", "name": "Test Account", "type": "Vendor"},
+        }
+
+    @pytest.mark.asyncio
+    async def test_validate_api_token_with_dotted_secret(self):
+        """Test that idt: tokens go straight to the api-tokens endpoint even if shaped like a JWT"""
+        mock_response = {"id": "TKN-1234-5678", "status": "Active", "account": {"id": "ACC-123-456", "name": "Test Account"}}
+
+        with (
+            patch("src.token_validator._get_jwks_url_from_token") as mock_jwks_url,
+            patch("src.token_validator.httpx.AsyncClient") as mock_client_class,
+        ):
+            mock_response_obj = AsyncMock()
+            mock_response_obj.status_code = 200
+            mock_response_obj.json = lambda: mock_response
+            mock_client = AsyncMock()
+            mock_client.get = AsyncMock(return_value=mock_response_obj)
+            mock_client_class.return_value = mock_client
+
+            is_valid, _, _ = await validate_token("idt:TKN-1234-5678:SE.CR.ET", "https://api.test.com", use_cache=False)
+
+        assert is_valid is True
+        mock_jwks_url.assert_not_called()
+        assert mock_client.get.call_args[0][0] == "https://api.test.com/public/v1/accounts/api-tokens/TKN-1234-5678"
+
     @pytest.mark.asyncio
     async def test_validate_token_inactive(self):
         """Test validation of inactive token - SKIPPED: implementation accepts any status"""
@@ -318,7 +615,7 @@ class TestValidateToken:
 
             mock_client = AsyncMock()
             mock_client.get = AsyncMock(return_value=mock_response_obj)
-            mock_client_class.return_value.__aenter__.return_value = mock_client
+            mock_client_class.return_value = mock_client
 
             is_valid, token_info, error = await validate_token(token, api_base_url, use_cache=False)
 
@@ -338,7 +635,7 @@ class TestValidateToken:
         with patch("src.token_validator.httpx.AsyncClient") as mock_client_class:
             mock_client = AsyncMock()
             mock_client.get = AsyncMock(side_effect=Exception("404 Not Found"))
-            mock_client_class.return_value.__aenter__.return_value = mock_client
+            mock_client_class.return_value = mock_client
 
             is_valid, token_info, error = await validate_token(token, api_base_url, use_cache=False)
 
@@ -355,7 +652,7 @@ class TestValidateToken:
         with patch("src.token_validator.httpx.AsyncClient") as mock_client_class:
             mock_client = AsyncMock()
             mock_client.get = AsyncMock(side_effect=Exception("401 Unauthorized"))
-            mock_client_class.return_value.__aenter__.return_value = mock_client
+            mock_client_class.return_value = mock_client
 
             is_valid, token_info, error = await validate_token(token, api_base_url, use_cache=False)
 
@@ -383,7 +680,7 @@ class TestValidateToken:
 
             mock_client = AsyncMock()
             mock_client.get = AsyncMock(return_value=mock_response_obj)
-            mock_client_class.return_value.__aenter__.return_value = mock_client
+            mock_client_class.return_value = mock_client
 
             # First call - should hit API
             is_valid1, token_info1, error1 = await validate_token(token, api_base_url, use_cache=True)
@@ -417,7 +714,7 @@ class TestValidateToken:
 
             mock_client = AsyncMock()
             mock_client.get = AsyncMock(return_value=mock_response_obj)
-            mock_client_class.return_value.__aenter__.return_value = mock_client
+            mock_client_class.return_value = mock_client
 
             # First call
             await validate_token(token, api_base_url, use_cache=False)
@@ -447,7 +744,7 @@ class TestValidateToken:
 
             mock_client = AsyncMock()
             mock_client.get = AsyncMock(return_value=mock_response_obj)
-            mock_client_class.return_value.__aenter__.return_value = mock_client
+            mock_client_class.return_value = mock_client
 
             is_valid, token_info, error = await validate_token(token, api_base_url, use_cache=False)
 
@@ -477,10 +774,71 @@ class TestValidateToken:
             assert error is not None
             assert "JWT verification" in error or "JWT_JWKS_URL" in error or "iss" in error
 
+    @pytest.mark.asyncio
+    async def test_validate_token_jwt_builds_user_token_info(self):
+        """Verified JWTs are checked against the user endpoint and reported in api-token shape"""
+        payload = {"https://claims.softwareone.com/userId": "USR-1234-5678", "https://claims.softwareone.com/accountId": "ACC-1111-2222"}
+        user_response = {"name": "Jane", "email": "jane@example.com", "status": "Disabled", "account": {"id": "ACC-9999", "name": "Test Account"}}
+
+        with (
+            patch("src.token_validator.config") as mock_config,
+            patch("src.token_validator._verify_jwt_and_get_payload", new_callable=AsyncMock, return_value=(payload, None)),
+            patch("src.token_validator.httpx.AsyncClient") as mock_client_class,
+        ):
+            mock_config.jwt_jwks_url = "https://login.example.com/.well-known/jwks.json"
+            mock_response_obj = AsyncMock()
+            mock_response_obj.status_code = 200
+            mock_response_obj.json = lambda: user_response
+            mock_client = AsyncMock()
+            mock_client.get = AsyncMock(return_value=mock_response_obj)
+            mock_client_class.return_value = mock_client
+
+            is_valid, token_info, error = await validate_token("header.payload.signature", "https://api.test.com/", use_cache=False)
+
+        assert is_valid is False
+        assert "not active" in error
+        assert mock_client.get.call_args[0][0] == "https://api.test.com/public/v1/accounts/users/USR-1234-5678"
+        assert token_info == {
+            "id": "USR-1234-5678",
+            "name": "JWT User: Jane",
+            "status": "Disabled",
+            "account": {"id": "ACC-1111-2222", "name": "Test Account"},
+            "user": {"id": "USR-1234-5678", "name": "Jane", "email": "jane@example.com"},
+            "type": "jwt",
+        }
+
+    @pytest.mark.asyncio
+    async def test_validate_token_jwt_unknown_user(self):
+        """A 404 from the user endpoint names the user, not the token"""
+        payload = {"https://claims.softwareone.com/userId": "USR-1234-5678"}
+
+        with (
+            patch("src.token_validator.config") as mock_config,
+            patch("src.token_validator._verify_jwt_and_get_payload", new_callable=AsyncMock, return_value=(payload, None)),
+            patch("src.token_validator.httpx.AsyncClient") as mock_client_class,
+        ):
+            mock_config.jwt_jwks_url = "https://login.example.com/.well-known/jwks.json"
+            mock_response_obj = AsyncMock()
+            mock_response_obj.status_code = 404
+            mock_client = AsyncMock()
+            mock_client.get = AsyncMock(return_value=mock_response_obj)
+            mock_client_class.return_value = mock_client
+
+            is_valid, token_info, error = await validate_token("header.payload.signature", "https://api.test.com/", use_cache=False)
+
+        assert is_valid is False
+        assert token_info is None
+        assert error == "User USR-1234-5678 not found (404)"
+
 
 class TestJwtExpLeeway:
     """Test JWT exp leeway in _verify_jwt_and_get_payload (clock skew tolerance)."""
 
+    @pytest.fixture(autouse=True)
+    def reset_verified_jwt_cache(self, monkeypatch):
+        """Tests reuse one token with different mocked payloads, so start each without verified payloads"""
+        monkeypatch.setattr("src.token_validator._verified_jwt_cache", {})
+
     @pytest.mark.unit
     @pytest.mark.asyncio
     async def test_jwt_exp_within_leeway_accepted(self):
@@ -553,3 +911,144 @@ class TestJwtExpLeeway:
 
         assert result_payload == payload_no_exp
         assert error is None
+
+
+class TestFetchJwksCached:
+    """JWKS documents are fetched once per URL and reused until they expire"""
+
+    @pytest.mark.asyncio
+    async def test_jwks_fetched_once_until_expiry(self, monkeypatch):
+        """A cached JWKS is served until its monotonic expiry passes"""
+        from unittest.mock import Mock
+
+        from src import token_validator
+
+        monkeypatch.setattr(token_validator, "_http_clients", weakref.WeakKeyDictionary())
+        monkeypatch.setattr(token_validator, "_jwks_cache", {})
+        jwks_url = "https://login.example.com/.well-known/jwks.json"
+        jwks = {"keys": [{"kid": "k1"}]}
+
+        with patch("src.token_validator.httpx.AsyncClient") as mock_client_class:
+            mock_client = AsyncMock()
+            mock_client.get = AsyncMock(return_value=Mock(json=lambda: jwks))
+            mock_client_class.return_value = mock_client
+
+            assert await token_validator._fetch_jwks_cached(jwks_url) == jwks
+            assert await token_validator._fetch_jwks_cached(jwks_url) == jwks
+            assert mock_client.get.await_count == 1
+
+            token_validator._jwks_cache[jwks_url] = (jwks, time.monotonic() - 1)
+            await token_validator._fetch_jwks_cached(jwks_url)
+            assert mock_client.get.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_jwks_misses_share_one_fetch(self, monkeypatch):
+        """Concurrent cache misses for one JWKS URL make a single request"""
+        import asyncio
+        from unittest.mock import Mock
+
+        from src import token_validator
+
+        monkeypatch.setattr(token_validator, "_http_clients", weakref.WeakKeyDictionary())
+        monkeypatch.setattr(token_validator, "_jwks_cache", {})
+        jwks = {"keys": [{"kid": "k1"}]}
+
+        async def slow_get(*args, **kwargs):
+            await asyncio.sleep(0)
+            return Mock(json=lambda: jwks)
+
+        with patch("src.token_validator.httpx.AsyncClient") as mock_client_class:
+            mock_client = AsyncMock()
+            mock_client.get = AsyncMock(side_effect=slow_get)
+            mock_client_class.return_value = mock_client
+
+            results = await asyncio.gather(*(token_validator._fetch_jwks_cached("https://login.example.com/.well-known/jwks.json") for _ in range(5)))
+
+        assert mock_client.get.await_count == 1
+        assert results == [jwks] * 5
+        assert token_validator._jwks_inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_jwks_near_expiry_served_while_refreshed(self, monkeypatch):
+        """A JWKS close to expiry is returned immediately and refreshed in the background"""
+        import asyncio
+        from unittest.mock import Mock
+
+        from src import token_validator
+
+        monkeypatch.setattr(token_validator, "_http_clients", weakref.WeakKeyDictionary())
+        jwks_url = "https://login.example.com/.well-known/jwks.json"
+        old_jwks = {"keys": [{"kid": "old"}]}
+        new_jwks = {"keys": [{"kid": "new"}]}
+        monkeypatch.setattr(token_validator, "_jwks_cache", {jwks_url: (old_jwks, time.monotonic() + 10)})
+        monkeypatch.setattr(token_validator, "_jwks_refresh_retry_at", {})
+
+        with patch("src.token_validator.httpx.AsyncClient") as mock_client_class:
+            mock_client = AsyncMock()
+            mock_client.get = AsyncMock(return_value=Mock(json=lambda: new_jwks))
+            mock_client_class.return_value = mock_client
+
+            assert await token_validator._fetch_jwks_cached(jwks_url) == old_jwks
+            assert await token_validator._fetch_jwks_cached(jwks_url) == old_jwks
+            await asyncio.gather(*token_validator._jwks_inflight.values())
+
+        assert mock_client.get.await_count == 1
+        assert token_validator._jwks_cache[jwks_url][0] == new_jwks
+
+    @pytest.mark.asyncio
+    async def test_failed_jwks_refresh_backs_off(self, monkeypatch):
+        """After a failed background refresh, the next refresh waits for the retry deadline"""
+        import asyncio
+
+        import httpx
+
+        from src import token_validator
+
+        monkeypatch.setattr(token_validator, "_http_clients", weakref.WeakKeyDictionary())
+        monkeypatch.setattr(token_validator, "_jwks_refresh_retry_at", {})
+        jwks_url = "https://login.example.com/.well-known/jwks.json"
+        old_jwks = {"keys": [{"kid": "old"}]}
+        monkeypatch.setattr(token_validator, "_jwks_cache", {jwks_url: (old_jwks, time.monotonic() + 10)})
+
+        with patch("src.token_validator.httpx.AsyncClient") as mock_client_class:
+            mock_client = AsyncMock()
+            mock_client.get = AsyncMock(side_effect=httpx.ConnectError("down"))
+            mock_client_class.return_value = mock_client
+
+            assert await token_validator._fetch_jwks_cached(jwks_url) == old_jwks
+            await asyncio.gather(*token_validator._jwks_inflight.values())
+            assert await token_validator._fetch_jwks_cached(jwks_url) == old_jwks
+            assert token_validator._jwks_inflight == {}
+            assert mock_client.get.await_count == 1
+
+            token_validator._jwks_refresh_retry_at[jwks_url] = time.monotonic() - 1
+            await token_validator._fetch_jwks_cached(jwks_url)
+            await asyncio.gather(*token_validator._jwks_inflight.values())
+            assert mock_client.get.await_count == 2
+
+
+class TestVerifiedJwtCache:
+    """Verified JWT payloads are reused until the token expires"""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_repeat_verification_skips_signature_check(self, monkeypatch):
+        """A second verification of the same token reuses the payload but still checks exp"""
+        monkeypatch.setattr("src.token_validator._verified_jwt_cache", {})
+        token = "eyJhbGciOiJSUzI1NiJ9.eyJleHAiOjB9.sig"
+        jwks_url = "https://auth.test.com/.well-known/jwks.json"
+        payload = {"exp": time.time() + 3600}
+
+        with patch("src.token_validator._fetch_jwks_cached", new_callable=AsyncMock, return_value={"keys": []}) as mock_fetch:
+            with patch("src.token_validator.jose_jwt.decode", return_value=payload) as mock_decode:
+                first = await _verify_jwt_and_get_payload(token, jwks_url)
+                second = await _verify_jwt_and_get_payload(token, jwks_url)
+                with patch("src.token_validator.time.time", return_value=payload["exp"] + 3600):
+                    expired = await _verify_jwt_and_get_payload(token, jwks_url)
+                other = await _verify_jwt_and_get_payload("eyJhbGciOiJSUzI1NiJ9.eyJleHAiOjF9.sig", jwks_url)
+
+        assert first == second == (payload, None)
+        assert expired == (None, "Token expired")
+        assert other == (payload, None)
+        assert mock_decode.call_count == 2
+        assert mock_fetch.await_count == 2
@@ -260,6 +260,32 @@ class TestMultipleQueryExamples:
                 assert "filtering_tips" in result
                 assert "status" in result["filtering_tips"]
 
+    def test_resource_info_uses_precomputed_parameter_info(self):
+        """Test that enum and path parameter info precomputed at init is used as-is"""
+        from src.mcp_tools import execute_marketplace_resource_info, extract_parameter_info
+
+        parameters = [
+            {"name": "id", "in": "path", "schema": {"type": "string"}},
+            {"name": "status", "in": "query", "schema": {"enum": ["Active", "Completed"]}},
+        ]
+        enum_fields, path_params_info = extract_parameter_info(parameters)
+        mock_registry = {
+            "commerce.orders.by_id": {
+                "path": "/public/v1/commerce/orders/{id}",
+                "summary": "Order",
+                "parameters": parameters,
+                "enum_fields": enum_fields,
+                "path_params_info": path_params_info,
+            }
+        }
+
+        result = execute_marketplace_resource_info("commerce.orders.by_id", mock_registry)
+
+        assert result["enum_fields"] is enum_fields
+        assert result["enum_fields"] == {"status": ["Active", "Completed"]}
+        assert result["path_parameters"] is path_params_info
+        assert path_params_info["id"]["type"] == "string"
+
 
 class TestAPIErrorDetailsPreservation:
     """Test that API error details are preserved in responses"""